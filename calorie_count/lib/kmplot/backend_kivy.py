@@ -287,7 +287,6 @@ from kivy.graphics import (
     StencilPush,
     StencilUnUse,
     StencilUse,
-    Translate,
 )
 from kivy.graphics.context_instructions import PopMatrix, PushMatrix
 from kivy.graphics.instructions import InstructionGroup
@@ -324,6 +323,7 @@ import io
 import numbers
 import textwrap
 import uuid
+from collections import OrderedDict
 from functools import partial
 from math import cos, pi, sin
 
@@ -335,6 +335,41 @@ toolbar = None
 my_canvas = None
 
 
+class TextCache(object):
+    """Least recently used cache of rendered text textures and text metrics.
+    A single instance (`text_cache`) is shared by all the RendererKivy
+    instances so redraws of any figure (resize, zoom, pan) do not rasterize
+    identical labels again.
+    """
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, factory):
+        """Return the value cached for key. On a miss the value is created by
+        calling factory() and the least recently used entry is evicted if
+        the cache is full.
+        """
+        try:
+            value = self._entries.pop(key)
+        except KeyError:
+            value = factory()
+        self._entries[key] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+
+text_cache = TextCache()
+
+
 class SaveDialog(FloatLayout):
     save = ObjectProperty(None)
     text_input = ObjectProperty(None)
@@ -527,9 +562,11 @@ class RendererKivy(RendererBase):
             else:
                 polygons = path.to_polygons(transform)
             path_codes.append(polygons)
-        # Apply the styles and rgbFace to each one of the raw paths from
-        # the list. Additionally a transformation is being applied to
-        # translate each independent path
+        # Group the collection elements by raw path and style so every group
+        # is emitted as one batched Mesh instead of one instruction group
+        # per element.
+        styles = {}
+        positions = {}
         for xo, yo, path_poly, gc0, rgbFace in self._iter_collection(
             gc,
             master_transform,
@@ -545,14 +582,28 @@ class RendererKivy(RendererBase):
             urls,
             offset_position,
         ):
-            list_canvas_instruction = self.get_path_instructions(
-                gc0, path_poly, closed=True, rgbFace=rgbFace
+            key = (id(path_poly), str(gc0._get_style_dict(rgbFace)))
+            if key not in styles:
+                # gc0 is re-used by _iter_collection, so its values are copied
+                styles[key] = (
+                    path_poly,
+                    None if rgbFace is None else tuple(rgbFace),
+                    tuple(gc0.get_rgb()),
+                    gc0.get_linewidth(),
+                    bool(gc0.line["dash_list"]),
+                )
+                positions[key] = []
+            positions[key].append((xo, yo))
+        for key, (path_poly, rgbFace, rgb, linewidth, dashed) in styles.items():
+            self.draw_batched(
+                gc,
+                self.tesselate_polygons(path_poly),
+                positions[key],
+                rgbFace,
+                rgb,
+                linewidth,
+                dashed,
             )
-            for widget, instructions in list_canvas_instruction:
-                widget.canvas.add(PushMatrix())
-                widget.canvas.add(Translate(xo, yo))
-                widget.canvas.add(instructions)
-                widget.canvas.add(PopMatrix())
 
     def collides_with_existent_stencil(self, x, y):
         """Check all the clipareas and returns the index of the clip area that
@@ -729,56 +780,32 @@ class RendererKivy(RendererBase):
         if ismath:
             self.draw_mathtext(gc, x, y, s, prop, angle)
         else:
-            font = resource_find(prop.get_name() + ".ttf")
-            color = gc.get_rgb()
-            if font is None:
-                plot_text = CoreLabel(font_size=prop.get_size_in_points(), color=color)
-            else:
-                plot_text = CoreLabel(
-                    font_size=prop.get_size_in_points(),
-                    font_name=prop.get_name(),
-                    color=color,
-                )
-            plot_text.text = six.text_type("{}".format(s))
-            if prop.get_style() == "italic":
-                plot_text.italic = True
-            if self.weight_as_number(prop.get_weight()) > 500:
-                plot_text.bold = True
-            plot_text.refresh()
+            texture = self.get_text_texture(s, prop)
             with self.widget.canvas:
+                Color(*gc.get_rgb())  # (tints the white text texture)
                 if isinstance(angle, float):
                     PushMatrix()
                     Rotate(angle=angle, origin=(int(x), int(y)))
                     Rectangle(
                         pos=(int(x), int(y)),
-                        texture=plot_text.texture,
-                        size=plot_text.texture.size,
+                        texture=texture,
+                        size=texture.size,
                     )
                     PopMatrix()
                 else:
                     Rectangle(
                         pos=(int(x), int(y)),
-                        texture=plot_text.texture,
-                        size=plot_text.texture.size,
+                        texture=texture,
+                        size=texture.size,
                     )
 
     def draw_mathtext(self, gc, x, y, s, prop, angle):
         """Draw the math text using matplotlib.mathtext. The position
         x,y is given in Kivy coordinates.
         """
-        ftimage, depth = self.mathtext_parser.parse(s, self.dpi, prop)
-        w = ftimage.get_width()
-        h = ftimage.get_height()
-        texture = Texture.create(size=(w, h))
-        if _mpl_ge_1_5:
-            texture.blit_buffer(
-                ftimage.as_rgba_str()[0][0], colorfmt="rgba", bufferfmt="ubyte"
-            )
-        else:
-            texture.blit_buffer(
-                ftimage.as_rgba_str(), colorfmt="rgba", bufferfmt="ubyte"
-            )
-        texture.flip_vertical()
+        key = ("mathtext", self.dpi) + self._text_key(s, prop)
+        texture = text_cache.get(key, partial(self._create_mathtext_texture, s, prop))
+        w, h = texture.size
         with self.widget.canvas:
             Rectangle(texture=texture, pos=(x, y), size=(w, h))
 
@@ -805,10 +832,11 @@ class RendererKivy(RendererBase):
             widget.canvas.add(instructions)
 
     def draw_markers(self, gc, marker_path, marker_trans, path, trans, rgbFace=None):
-        """Markers graphics instructions are stored on a dictionary and
+        """Markers tesselated geometry is stored on a dictionary and
         hashed through graphics context and rgbFace values. If a marker_path
-        with the corresponding graphics context exist then the instructions
-        are pulled from the markers dictionary.
+        with the corresponding graphics context exist then the geometry
+        is pulled from the markers dictionary. All the markers of a call are
+        rendered as one batch, see `draw_batched`.
         """
         if not len(path.vertices):
             return
@@ -819,26 +847,178 @@ class RendererKivy(RendererBase):
         # get a string representation of the graphics context and rgbFace.
         style = str(gc._get_style_dict(rgbFace))
         dictkey = (path_data, str(style))
-        # check whether this marker has been created before.
-        list_instructions = self._markers.get(dictkey)
-        # creating a list of instructions for the specific marker.
-        if list_instructions is None:
+        # check whether this marker has been tesselated before.
+        geometry = self._markers.get(dictkey)
+        if geometry is None:
             if _mpl_ge_2_0:
                 polygons = marker_path.to_polygons(marker_trans, closed_only=False)
             else:
                 polygons = marker_path.to_polygons(marker_trans)
-            self._markers[dictkey] = self.get_path_instructions(
-                gc, polygons, rgbFace=rgbFace
+            geometry = self._markers[dictkey] = self.tesselate_polygons(polygons)
+        # All the positions where a marker should be rendered
+        positions = [
+            vertices[-2:]
+            for vertices, codes in path.iter_segments(trans, simplify=False)
+            if len(vertices)
+        ]
+        self.draw_batched(
+            gc,
+            geometry,
+            positions,
+            rgbFace,
+            gc.get_rgb(),
+            gc.get_linewidth(),
+            bool(gc.line["dash_list"]),
+        )
+
+    def tesselate_polygons(self, polygons):
+        """Tesselate a set of polygons once so the result can be replicated
+        at many positions. Returns numpy arrays of (fill vertices, fill
+        triangle indices, outline vertices, outline segment indices). The
+        vertices are given in kivy coordinates.
+        """
+        fill_xy, fill_idx, line_xy, line_idx = [], [], [], []
+        n_fill = n_line = 0
+        for polygon in polygons:
+            points = np.asarray(polygon, dtype=float).reshape(-1, 2)
+            if not len(points):
+                continue
+            points = points + (self.widget.x, self.widget.y)
+            tess = Tesselator()
+            tess.add_contour(points.ravel().tolist())
+            if tess.tesselate():
+                for vertices, indices in tess.meshes:
+                    if len(indices) < 3:
+                        continue
+                    # triangle_fan meshes can't be concatenated, triangles can.
+                    fan = np.asarray(indices, dtype=np.int64)
+                    triangles = np.column_stack(
+                        (np.full(len(fan) - 2, fan[0]), fan[1:-1], fan[2:])
+                    )
+                    xy = np.asarray(vertices, dtype=float).reshape(-1, 4)[:, :2]
+                    fill_xy.append(xy)
+                    fill_idx.append(triangles + n_fill)
+                    n_fill += len(xy)
+            else:
+                Logger.warning("Tesselator didn't work :(")
+            segments = np.arange(len(points) - 1)
+            line_xy.append(points)
+            line_idx.append(np.column_stack((segments, segments + 1)) + n_line)
+            n_line += len(points)
+
+        def _stack(arrays, columns, dtype):
+            if not arrays:
+                return np.empty((0, columns), dtype=dtype)
+            return np.concatenate(arrays).astype(dtype)
+
+        return (
+            _stack(fill_xy, 2, float),
+            _stack(fill_idx, 3, np.int64),
+            _stack(line_xy, 2, float),
+            _stack(line_idx, 2, np.int64),
+        )
+
+    def draw_batched(
+        self, gc, geometry, positions, rgbFace, rgb, linewidth, dashed=False
+    ):
+        """Render a tesselated geometry (see `tesselate_polygons`) at every
+        (x, y) of positions. The positions are grouped by the clip area they
+        fall in, and the fills of a group are combined into a single
+        :class:`kivy.graphics.Mesh`, as are thin solid outlines, so the amount
+        of canvas instructions depends on the amount of styles and clip areas
+        and not on the amount of elements.
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        clips = {}
+        for position in positions:
+            clips.setdefault(self.handle_clip_rectangle(gc, *position), []).append(
+                position
+            )
+        for newclip, clip_positions in clips.items():
+            widget = self.clip_rectangles[newclip] if newclip > -1 else self.widget
+            widget.canvas.add(
+                self._batched_instructions(
+                    gc,
+                    geometry,
+                    np.asarray(clip_positions),
+                    rgbFace,
+                    rgb,
+                    linewidth,
+                    dashed,
+                )
+            )
+
+    def _batched_instructions(
+        self, gc, geometry, positions, rgbFace, rgb, linewidth, dashed
+    ):
+        """The InstructionGroup of `draw_batched` for positions in the same
+        clip area.
+        """
+        fill_xy, fill_idx, line_xy, line_idx = geometry
+        instruction_group = InstructionGroup()
+        if rgbFace is not None and len(fill_idx):
+            instruction_group.add(Color(*rgbFace))
+            meshes = self._replicate_mesh(fill_xy, fill_idx, positions, "triangles")
+            for mesh in meshes:
+                instruction_group.add(mesh)
+        if linewidth > 0 and len(line_idx):
+            instruction_group.add(Color(*rgb))
+            width = int(linewidth / 2)
+            if width <= 1 and not dashed:
+                meshes = self._replicate_mesh(line_xy, line_idx, positions, "lines")
+                for mesh in meshes:
+                    instruction_group.add(mesh)
+            else:
+                # Wide or dashed outlines need Line (one per polygon, so the
+                # dashes and joints run along it), shifted without a matrix.
+                outlines = self._outlines(line_xy, line_idx)
+                for x, y in positions:
+                    for outline in outlines:
+                        instruction_group.add(
+                            Line(
+                                points=(outline + (x, y)).ravel().tolist(),
+                                width=width,
+                                dash_length=gc.line["dash_length"],
+                                dash_offset=gc.line["dash_offset"],
+                                dash_joint=gc.line["join_style"],
+                                dash_list=list(gc.line["dash_list"] or []),
+                            )
+                        )
+        return instruction_group
+
+    @staticmethod
+    def _outlines(line_xy, line_idx):
+        """Split the outline segments (see `tesselate_polygons`) back into
+        the vertices of each polygon.
+        """
+        # a polygon starts wherever a segment doesn't continue the previous one
+        starts = np.flatnonzero(line_idx[1:, 0] != line_idx[:-1, 1]) + 1
+        return [
+            line_xy[segments[0, 0] : segments[-1, 1] + 1]
+            for segments in np.split(line_idx, starts)
+        ]
+
+    # Kivy indexes mesh vertices with unsigned shorts.
+    _max_mesh_vertices = 65535
+
+    def _replicate_mesh(self, xy, indices, positions, mode):
+        """Generate the Meshes of the vertices xy and indices replicated at
+        every position. A new Mesh is only started when a single one would
+        exceed the vertex limit of kivy.
+        """
+        per_mesh = max(1, self._max_mesh_vertices // len(xy))
+        for start in range(0, len(positions), per_mesh):
+            chunk = positions[start : start + per_mesh]
+            vertices = np.zeros((len(chunk), len(xy), 4))
+            vertices[..., :2] = xy[None] + chunk[:, None]
+            chunk_indices = indices[None] + (np.arange(len(chunk)) * len(xy))[
+                :, None, None
+            ]
+            yield Mesh(
+                vertices=vertices.ravel().tolist(),
+                indices=chunk_indices.ravel().tolist(),
+                mode=str(mode),
             )
-        # Traversing all the positions where a marker should be rendered
-        for vertices, codes in path.iter_segments(trans, simplify=False):
-            if len(vertices):
-                x, y = vertices[-2:]
-                for widget, instructions in self._markers[dictkey]:
-                    widget.canvas.add(PushMatrix())
-                    widget.canvas.add(Translate(x, y))
-                    widget.canvas.add(instructions)
-                    widget.canvas.add(PopMatrix())
 
     def flipy(self):
         return False
@@ -874,20 +1054,65 @@ class RendererKivy(RendererBase):
         according to their layout
         """
         if ismath:
-            ftimage, depth = self.mathtext_parser.parse(s, self.dpi, prop)
-            w = ftimage.get_width()
-            h = ftimage.get_height()
-            return w, h, depth
-        font = resource_find(prop.get_name() + ".ttf")
-        if font is None:
-            plot_text = CoreLabel(font_size=prop.get_size_in_points())
-        else:
-            plot_text = CoreLabel(
-                font_size=prop.get_size_in_points(), font_name=prop.get_name()
-            )
+            key = ("mathtext-metrics", self.dpi) + self._text_key(s, prop)
+            return text_cache.get(key, partial(self._mathtext_metrics, s, prop))
+        w, h = self.get_text_texture(s, prop).size
+        return w, h, 1
+
+    @staticmethod
+    def _text_key(s, prop):
+        """The key of a text in `text_cache`, the string and everything in
+        the font properties that changes the way it is rasterized.
+        """
+        return (
+            six.text_type(s),
+            prop.get_name(),
+            prop.get_size_in_points(),
+            prop.get_style(),
+            prop.get_weight(),
+        )
+
+    def get_text_texture(self, s, prop):
+        """Get the texture of the rendered text s from `text_cache`,
+        rendering it with a kivy CoreLabel on a miss.
+        The text is rendered white - drawing tints it with the text color,
+        so measuring and drawing (in any color) share a single texture.
+        """
+        key = ("text",) + self._text_key(s, prop)
+        return text_cache.get(key, partial(self._create_text_texture, s, prop))
+
+    def _create_text_texture(self, s, prop):
+        kwargs = {"font_size": prop.get_size_in_points()}
+        if resource_find(prop.get_name() + ".ttf") is not None:
+            kwargs["font_name"] = prop.get_name()
+        plot_text = CoreLabel(**kwargs)
         plot_text.text = six.text_type("{}".format(s))
+        if prop.get_style() == "italic":
+            plot_text.italic = True
+        if self.weight_as_number(prop.get_weight()) > 500:
+            plot_text.bold = True
         plot_text.refresh()
-        return plot_text.texture.size[0], plot_text.texture.size[1], 1
+        return plot_text.texture
+
+    def _create_mathtext_texture(self, s, prop):
+        ftimage, depth = self.mathtext_parser.parse(s, self.dpi, prop)
+        w = ftimage.get_width()
+        h = ftimage.get_height()
+        texture = Texture.create(size=(w, h))
+        if _mpl_ge_1_5:
+            texture.blit_buffer(
+                ftimage.as_rgba_str()[0][0], colorfmt="rgba", bufferfmt="ubyte"
+            )
+        else:
+            texture.blit_buffer(
+                ftimage.as_rgba_str(), colorfmt="rgba", bufferfmt="ubyte"
+            )
+        texture.flip_vertical()
+        return texture
+
+    def _mathtext_metrics(self, s, prop):
+        ftimage, depth = self.mathtext_parser.parse(s, self.dpi, prop)
+        return ftimage.get_width(), ftimage.get_height(), depth
 
     def new_gc(self):
         """Instantiate a GraphicsContextKivy object"""
@@ -1141,7 +1366,7 @@ class GraphicsContextKivy(GraphicsContextBase, object):
             if self.get_joinstyle() != "round":
                 attrib["line-linejoin"] = self.get_joinstyle()
             if self.get_capstyle() != "butt":
-                attrib["line-linecap"] = _capd[self.get_capstyle()]
+                attrib["line-linecap"] = self._capd[self.get_capstyle()]
         return attrib
 
 
@@ -1183,6 +1408,7 @@ class FigureCanvasKivy(FocusBehavior, Widget, FigureCanvasBase):
     """FigureCanvasKivy class. See module documentation for more information."""
 
     def __init__(self, figure, **kwargs):
+        self._draw_trigger = Clock.create_trigger(self._on_draw_idle)
         Window.bind(mouse_pos=self._on_mouse_pos)
         self.bind(size=self._on_size_changed)
         self.bind(pos=self._on_pos_changed)
@@ -1197,6 +1423,16 @@ class FigureCanvasKivy(FocusBehavior, Widget, FigureCanvasBase):
         self._renderer = RendererKivy(self)
         self.figure.draw(self._renderer)
 
+    def draw_idle(self, *args, **kwargs):
+        """Request a draw of the figure. Requests are coalesced through a kivy
+        Clock trigger, so a burst of them (resize animation, pan or zoom
+        drag) draws the figure at most once per frame.
+        """
+        self._draw_trigger()
+
+    def _on_draw_idle(self, *args):
+        self.draw()
+
     def on_touch_down(self, touch):
         """Kivy Event to trigger the following matplotlib events:
         `motion_notify_event`, `scroll_event`, `button_press_event`,
@@ -1322,7 +1558,7 @@ class FigureCanvasKivy(FocusBehavior, Widget, FigureCanvasBase):
         self.callbacks.process("figure_leave_event", event)
 
     def _on_pos_changed(self, *args):
-        self.draw()
+        self.draw_idle()
 
     def _on_size_changed(self, *args):
         """Changes the size of the matplotlib figure based on the size of the
@@ -1335,10 +1571,10 @@ class FigureCanvasKivy(FocusBehavior, Widget, FigureCanvasBase):
         hinch = float(h) / dpival
         self.figure.set_size_inches(winch, hinch, forward=False)
         # self.resize()
-        self.draw()
+        self.draw_idle()
 
     def callback(self, *largs):
-        self.draw()
+        self.draw_idle()
 
     def blit(self, bbox=None):
         """If bbox is None, blit the entire canvas to the widget. Otherwise
@@ -166,44 +166,59 @@ class FigureCanvasKivyAgg(FigureCanvasKivy, FigureCanvasAgg):
         super(FigureCanvasKivyAgg, self).__init__(figure=self.figure, **kwargs)
         self.img_texture = None
         self.img_rect = None
-        self.blit()
+        self.bg_rect = None
 
     def draw(self):
         '''
-        Draw the figure using the agg renderer
+        Draw the figure using the agg renderer. The existing texture is
+        re-used as long as the size of the figure did not change.
         '''
-        self.canvas.clear()
         FigureCanvasAgg.draw(self)
-        if self.blitbox is None:
-            l, b, w, h = self.figure.bbox.bounds
-            w, h = int(w), int(h)
+        l, b, w, h = self.figure.bbox.bounds
+        w, h = int(w), int(h)
+        if self.img_texture is None or tuple(self.img_texture.size) != (w, h):
+            self.canvas.clear()
+            texture = Texture.create(size=(w, h))
+            texture.flip_vertical()
+            color = self.figure.get_facecolor()
+            with self.canvas:
+                Color(*color)
+                self.bg_rect = Rectangle(pos=self.pos, size=(w, h))
+                Color(1.0, 1.0, 1.0, 1.0)
+                self.img_rect = Rectangle(texture=texture, pos=self.pos,
+                                          size=(w, h))
+            self.img_texture = texture
+        self._on_pos_changed()  # (the widget may have moved without resizing)
+        self.blit()
+
+    def blit(self, bbox=None):
+        '''If bbox is None, blit the entire agg buffer to the texture.
+        Otherwise only the dirty area defined by the bbox is written into
+        the existing texture.
+        '''
+        if self.img_texture is None:
+            return
+        if bbox is None:
             buf_rgba = self.get_renderer().buffer_rgba()
+            self.img_texture.blit_buffer(bytes(buf_rgba), colorfmt='rgba',
+                                         bufferfmt='ubyte')
         else:
-            bbox = self.blitbox
-            l, b, r, t = bbox.extents
-            w = int(r) - int(l)
-            h = int(t) - int(b)
-            t = int(b) + h
-            reg = self.copy_from_bbox(bbox)
-            buf_rgba = reg.to_string()
-        texture = Texture.create(size=(w, h))
-        texture.flip_vertical()
-        color = self.figure.get_facecolor()
-        with self.canvas:
-            Color(*color)
-            Rectangle(pos=self.pos, size=(w, h))
-            Color(1.0, 1.0, 1.0, 1.0)
-            self.img_rect = Rectangle(texture=texture, pos=self.pos,
-                                      size=(w, h))
-        texture.blit_buffer(bytes(buf_rgba), colorfmt='rgba', bufferfmt='ubyte')
-        self.img_texture = texture
+            region = self.copy_from_bbox(bbox)
+            # extents are in buffer pixels, which is also the row order of
+            # the (vertically flipped) texture.
+            x1, y1, x2, y2 = region.get_extents()
+            self.img_texture.blit_buffer(bytes(memoryview(region)),
+                                         pos=(x1, y1), size=(x2 - x1, y2 - y1),
+                                         colorfmt='rgba', bufferfmt='ubyte')
+        self.canvas.ask_update()
 
     filetypes = FigureCanvasKivy.filetypes.copy()
     filetypes['png'] = 'Portable Network Graphics'
 
     def _on_pos_changed(self, *args):
-        if self.img_rect is not None:
-            self.img_rect.pos = self.pos
+        for rect in (self.bg_rect, self.img_rect):
+            if rect is not None:
+                rect.pos = self.pos
 
     def _print_image(self, filename, *args, **kwargs):
         '''Write out format png. The image is saved with the filename given.
@@ -0,0 +1,103 @@
+"""This module holds the backup and restore of the app DB (SQLite's online backup API - sqlite3.Connection.backup).
+    - 'backup' copies the DB page by page (PAGES_PER_STEP at a time, other connections keep working between steps)
+      into a gzip compressed snapshot file. The file is written under a temporary name and then renamed.
+    - 'restore' copies a snapshot back into the app DB in a single write transaction - other connections see either
+      the old or the restored DB, and a restore that fails midway is rolled back.
+Both report their progress as progress(pages copied, total pages) and are blocking -
+run them as background jobs (see utils/jobs.py, an exception raised by progress aborts the copy)."""
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+from typing import Callable, Optional
+
+from calorie_count.src.DB import changes, profiles, write_behind
+from calorie_count.src.DB.statements import Statements
+from calorie_count.src.utils import config
+
+logger = logging.getLogger(__name__)
+
+PAGES_PER_STEP = 256
+SUFFIX = '.db.gz'
+REQUIRED_TABLES = {'food', 'meal_entries'}
+
+Progress = Callable[[int, int], None]  # (pages copied, total pages) -> None
+
+SQL = Statements(
+    quick_check="PRAGMA quick_check",
+    tables="SELECT name FROM sqlite_master WHERE type = 'table'",
+)
+
+
+def _copy(src: sqlite3.Connection, dst: sqlite3.Connection, progress: Optional[Progress], pages: int) -> None:
+    def _progress(status, remaining, total):
+        if progress is not None:
+            progress(total - remaining, total)
+
+    src.backup(dst, pages=pages, progress=_progress)
+
+
+def backup(path: str, db_path: str = None, progress: Progress = None, pages: int = PAGES_PER_STEP) -> str:
+    """Write a compressed snapshot of the app DB to 'path'. Returns the path."""
+    write_behind.flush()  # (the queued meal-entries are part of the snapshot)
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, 'snapshot.db')
+        src, dst = profiles.connect(db_path or config.get_db_path()), sqlite3.connect(snapshot)
+        try:
+            _copy(src, dst, progress, pages)
+        finally:
+            src.close()
+            dst.close()
+
+        partial = f'{path}.part'
+        with open(snapshot, 'rb') as fl, gzip.open(partial, 'wb') as gz:
+            shutil.copyfileobj(fl, gz)
+        os.replace(partial, path)
+    logger.info(f'Backed up the DB to: {path}')
+    return path
+
+
+def restore(path: str, db_path: str = None, progress: Progress = None, pages: int = PAGES_PER_STEP) -> None:
+    """Replace the contents of the app DB with a snapshot (of 'backup').
+    Raises ValueError if the file isn't a valid snapshot (the DB is left as is)."""
+    write_behind.flush()  # (queued meal-entries would be written over the restored DB)
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, 'snapshot.db')
+        try:
+            with gzip.open(path, 'rb') as gz, open(snapshot, 'wb') as fl:
+                shutil.copyfileobj(gz, fl)
+        except (OSError, EOFError) as e:  # (gzip.BadGzipFile is an OSError)
+            raise ValueError(f'Not a DB snapshot: {path} ({e})') from e
+
+        src = sqlite3.connect(snapshot)
+        try:
+            _validate(src, path)
+            dst = profiles.connect(db_path or config.get_db_path())
+            try:
+                _copy(src, dst, progress, pages)
+            finally:
+                dst.close()
+        finally:
+            src.close()
+
+    # Everything may have changed - the caches are dropped
+    changes.publish(changes.FOOD)
+    changes.publish(changes.MEAL_ENTRIES)
+    logger.info(f'Restored the DB from: {path}')
+
+
+def _validate(conn: sqlite3.Connection, path: str) -> None:
+    """Helper function - raises ValueError if the snapshot is corrupt or isn't of the app DB."""
+    try:
+        problems = [problem for problem, in conn.execute(SQL.quick_check)]
+        tables = {name for name, in conn.execute(SQL.tables)}
+    except sqlite3.DatabaseError as e:  # e.g. file is not a database
+        raise ValueError(f'Not a DB snapshot: {path} ({e})') from e
+    if problems != ['ok']:
+        raise ValueError(f'Corrupt DB snapshot: {path} ({problems[:10]})')
+    if not REQUIRED_TABLES <= tables:
+        raise ValueError(f'Not a DB snapshot: {path} (missing tables: {REQUIRED_TABLES - tables})')
@@ -0,0 +1,56 @@
+"""This module holds the data-change bus of the app DB.
+Every write of FoodDB/MealEntryDB is published here and bumps the version of its table,
+so screens and caches can refresh only what changed (and only when it changed):
+    - Subscribe to a table to be notified of its changes, or
+    - Keep the versions seen (see 'versions') and compare them later.
+
+Note: Subscribers are called on the thread that wrote to the DB."""
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from typing import Any, Callable
+
+FOOD = 'food'
+MEAL_ENTRIES = 'meal_entries'
+
+Subscriber = Callable[[str, int, dict[str, Any]], None]  # (table, version, details) -> None
+
+_lock = threading.Lock()
+_versions: dict[str, int] = defaultdict(int)
+_subscribers: dict[str, list[Subscriber]] = defaultdict(list)
+
+
+def version(table: str) -> int:
+    """Get the current version of a table (bumped on every change)."""
+    return _versions[table]
+
+
+def versions(*tables: str) -> tuple[int, ...]:
+    """Get the current versions of the tables given."""
+    with _lock:
+        return tuple(_versions[t] for t in tables)
+
+
+def publish(table: str, **details) -> int:
+    """Publish a change to a table, details describe what changed (e.g. names=[..], dates=[..]).
+    Returns the new version of the table."""
+    with _lock:
+        _versions[table] += 1
+        ver = _versions[table]
+        subscribers = list(_subscribers[table])
+    for subscriber in subscribers:
+        subscriber(table, ver, details)
+    return ver
+
+
+def subscribe(table: str, subscriber: Subscriber) -> None:
+    """Call subscriber(table, version, details) on every change to the table."""
+    with _lock:
+        _subscribers[table].append(subscriber)
+
+
+def unsubscribe(table: str, subscriber: Subscriber) -> None:
+    with _lock:
+        if subscriber in _subscribers[table]:
+            _subscribers[table].remove(subscriber)
@@ -1,11 +1,15 @@
 from __future__ import annotations
 import atexit
 import sqlite3
-from dataclasses import dataclass, asdict, astuple
+from dataclasses import dataclass, astuple
+from itertools import islice
 from pathlib import Path
 from typing import Generator
 from difflib import SequenceMatcher
 
+from calorie_count.src.DB import profiles, tracing
+from calorie_count.src.DB.statements import Statements, placeholders
+
 
 def similarity(a: str, b: str) -> float:
     """Get similarity between 2 strings based on diff-lib's SequenceMatcher ratio"""
@@ -31,24 +35,38 @@ class FoodData:
         return {a: b for x in ','.split(self.portions) for a, b in ':'.split(x)}
 
 
+SQL = Statements(
+    create_table='''CREATE TABLE if not exists foods(
+                        description text,
+                        portions text,
+                        protein real,
+                        fats real,
+                        carbs real,
+                        sodium real,
+                        sugar real,
+                        water real
+                    )''',
+    insert=f"INSERT INTO foods VALUES ({placeholders(8)})",
+    containing="SELECT * FROM foods WHERE description LIKE ?",
+    similar="SELECT * FROM foods WHERE description NOT LIKE ? AND edit_dist(`description`, ?) >= 0.9",
+)
+
+
 class ExternalFoodsDB:
     def __init__(self, locally: bool = False):
+        """locally - building the DB (see parsing.py), otherwise the bundled asset is opened read-only:
+        without the profile's PRAGMAs (e.g. WAL would write '-wal'/'-shm' files next to it)."""
         path = next(Path().glob('**/external_foods'), None)
         assert path, 'Could not find "external_foods" file'
-        self.conn = sqlite3.connect(path)
-        atexit.register(lambda: self.conn.close())  # In-case 'with' not used
-        self.cursor = self.conn.cursor()
-        self.cursor.execute('''CREATE TABLE if not exists foods(
-                                description text,
-                                portions text,
-                                protein real,
-                                fats real,
-                                carbs real,
-                                sodium real,
-                                sugar real,
-                                water real
-                            )''')
-        self.conn.commit()
+        if locally:
+            self.conn = profiles.connect(path)
+        else:
+            self.conn = sqlite3.connect(f'{path.resolve().as_uri()}?mode=ro', uri=True)
+        atexit.register(self.conn.close)  # In-case 'with' not used
+        self.cursor = tracing.cursor(self.conn)
+        if locally:
+            self.cursor.execute(SQL.create_table)
+            self.conn.commit()
         self.conn.create_function('edit_dist', 2, similarity)
         self.conn.commit()
 
@@ -56,34 +74,36 @@ class ExternalFoodsDB:
         return self
 
     def __exit__(self, *a, **k):
+        self.cursor.close()
         self.conn.close()
+        atexit.unregister(self.conn.close)
 
     def add_food(self, food: FoodData):
         """Here we add a Food, parsed from an external API/JSON into ExternalFoodsDB."""
-        cmd = f'INSERT INTO foods Values {astuple(food)}'
-        print(cmd, asdict(food))
-        self.cursor.execute(cmd, asdict(food))
+        self.cursor.execute(SQL.insert, astuple(food))
         self.conn.commit()
 
-    def get_similar_food_by_name(self, name: str, max_results: int = 15) -> Generator[FoodData]:
+    def get_similar_food_by_name(self, name: str, max_results: int | None = 15) -> Generator[FoodData]:
         """Given a name of a food return the most similar food in the DB.
         Ordered most similar to least similar.
-        By default maximum of 5 values in the list, override 'max_results' to change this.
+        By default maximum of 15 values in the list, override 'max_results' to change this (None for no limit).
 
         Algorithm of similarity:
             1. Get foods where the given name is contained in the description.
-            2. If none found in 1. -  iterate row-by-row running edit-distance on them
-            add those that are > 0.9 ration.
-            (Note: SQLite has 'editdist3' but I don't think it can work on android) """
-        self.cursor.execute(f"SELECT * FROM foods WHERE description LIKE '%{name}%'")
+            2. If not enough found in 1. -  iterate row-by-row running edit-distance on the rest of the foods
+            add those that are > 0.9 ration (each food is returned once).
+            (Note: SQLite has 'editdist3' but I don't think it can work on android)
+        The edit-distance scans the whole table - don't pull the results on the UI thread. """
+        pattern = f'%{name}%'
+        self.cursor.execute(SQL.containing, (pattern,))
         count = 0
-        for _, row in zip(range(max_results), self.cursor):
+        for row in islice(self.cursor, max_results):
             food = FoodData(*row)
             yield food
             count += 1
 
-        if count < max_results:
-            self.cursor.execute(f"SELECT * FROM foods WHERE edit_dist(`description`,  '{name}') >= 0.9")
-            for _, row in zip(range(max_results - count), self.cursor):
+        if max_results is None or count < max_results:
+            self.cursor.execute(SQL.similar, (pattern, name))
+            for row in islice(self.cursor, None if max_results is None else max_results - count):
                 food = FoodData(*row)
                 yield food
@@ -1,18 +1,23 @@
 """This module holds a connection for our Food Database "FoodDB"
-Parameters to and from this DB are passed with instances of the  dataclass "Food". """
+Parameters to and from this DB are passed with instances of the  dataclass "Food".
+Foods are immutable, so the Foods loaded are shared - one per id (see FoodIdentityMap). """
 from __future__ import annotations
 
 import sqlite3
-from dataclasses import dataclass, field, astuple, asdict
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, astuple
 from datetime import datetime as dt
-from typing import Iterable, Any, Optional
+from typing import Any, Iterable, Iterator, Optional
 
+from calorie_count.src.DB import changes, profiles, tracing
+from calorie_count.src.DB.statements import Statements, placeholders
 from calorie_count.src.utils import config
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Food:
-    """This dataclass represents a row in FoodDB"""
+    """This dataclass represents a row in FoodDB (immutable)"""
     name: str
     portion: float  # (g)
     proteins: float  # (g)
@@ -24,11 +29,10 @@ class Food:
     id: str = field(default=None)
 
     def __post_init__(self):
-        self.portion = self.portion or 0
-        self.sodium = self.sodium or 0
-        self.sugar = self.sugar or 0
-        self.water = self.water or 0
-        self.id = self.name or dt.now().isoformat()
+        _set = object.__setattr__  # (frozen - the defaults are only set on creation)
+        for attr in ('portion', 'sodium', 'sugar', 'water'):
+            _set(self, attr, getattr(self, attr) or 0)
+        _set(self, 'id', self.id or self.name or dt.now().isoformat())
 
     @property
     def cals(self):
@@ -47,55 +51,215 @@ class Food:
         return astuple(self)[:-1] + (self.cals,)  # everything but "id" + calories
 
 
+SQL = Statements(
+    create_table='''CREATE TABLE if not exists food(
+                        name text PRIMARY KEY,
+                        portion real,
+                        protein real,
+                        fats real,
+                        carbs real,
+                        sugar real,
+                        sodium real,
+                        water real,
+                        id text
+                    )''',
+    all_foods="SELECT * FROM food",
+    all_names="SELECT name FROM food",
+    all_values="""SELECT name, portion, protein, fats, carbs, sugar, sodium, water, protein * 4 + carbs * 4 + fats * 9
+                    FROM food
+                   WHERE name != ''
+                   ORDER BY rowid""",
+    count="SELECT COUNT(*) FROM food WHERE name != ''",
+    food_by_name="SELECT * FROM food WHERE `name` = ?",
+    food_by_id="SELECT * FROM food WHERE `id` = ?",
+    insert=f"INSERT INTO food VALUES ({placeholders(9)})",
+    insert_or_replace=f"INSERT OR REPLACE INTO food VALUES ({placeholders(9)})",
+    create_removed="CREATE TEMP TABLE removed(name text PRIMARY KEY)",
+    insert_removed="INSERT OR IGNORE INTO removed VALUES (?)",
+    delete_removed="DELETE FROM food WHERE `name` IN (SELECT name FROM removed)",
+    drop_removed="DROP TABLE removed",
+)
+
+# SQL expression of each column in Food.columns() (for sorting and filtering in SQL)
+# (NULL numbers - e.g. imported, are 0: a NULL never matches the keyset condition of get_foods_page)
+COLUMN_EXPRESSIONS = dict(zip(Food.columns(), (
+    'name', *(f'COALESCE({c}, 0)' for c in ('portion', 'protein', 'fats', 'carbs', 'sugar', 'sodium', 'water')),
+    '(COALESCE(protein, 0) * 4 + COALESCE(carbs, 0) * 4 + COALESCE(fats, 0) * 9)')))
+_COMPARISONS = ('<=', '>=', '<', '>', '=')
+
+
+def _filter_clause(expression: str, text: str) -> tuple[str, tuple]:
+    """Helper function - parses a filter text on a column to an SQL condition and its parameters.
+    Numeric columns can be filtered with a comparison (e.g. '>10', '<=5.5'), otherwise the text is searched."""
+    if expression != 'name':
+        for op in _COMPARISONS:
+            if text.startswith(op):
+                try:
+                    return f'{expression} {op} ?', (float(text[len(op):]),)
+                except ValueError:
+                    break
+    escaped = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')  # (searched as is)
+    return f"{expression} LIKE ? ESCAPE '\\'", (f'%{escaped}%',)
+
+
+class FoodIdentityMap:
+    """The Foods loaded from FoodDB - one shared Food per id (instead of a copy per row).
+    Bounded (the least recently used are dropped) and kept up to date from the data-change bus."""
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._foods: OrderedDict[str, Food] = OrderedDict()
+        self._lock = threading.Lock()
+        changes.subscribe(changes.FOOD, self._on_change)
+
+    def __len__(self):
+        return len(self._foods)
+
+    def get(self, row: tuple) -> Food:
+        """Get the Food of a row of the 'food' table (name, portion, ..., id)"""
+        food_id = row[-1]
+        with self._lock:
+            food = self._foods.get(food_id)
+            if food is not None:
+                self._foods.move_to_end(food_id)
+                return food
+        food = Food(*row)
+        if food_id is None:
+            return food
+        with self._lock:
+            food = self._foods.setdefault(food_id, food)
+            if len(self._foods) > self.maxsize:
+                self._foods.popitem(last=False)
+        return food
+
+    def clear(self) -> None:
+        with self._lock:
+            self._foods.clear()
+
+    def _on_change(self, table: str, version: int, details: dict) -> None:
+        names = details.get('names')
+        if names is None:
+            self.clear()
+            return
+        with self._lock:
+            for name in names:  # (the id of a Food is its name)
+                self._foods.pop(name, None)
+
+
+foods = FoodIdentityMap()
+
+
 class FoodDB:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, conn: sqlite3.Connection = None):
+        """conn - share the connection (and its transaction) of another DB class, e.g. MealEntryDB.conn
+        (it's left open on exit)"""
         db_path = db_path or config.get_db_path()
         # Connect to DB (or create one if none exists)
-        self.conn = sqlite3.connect(db_path, timeout=15)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute('''CREATE TABLE if not exists food(
-                                name text PRIMARY KEY,
-                                portion real,
-                                protein real,
-                                fats real,
-                                carbs real,
-                                sugar real,
-                                sodium real, 
-                                water real,
-                                id text
-                            )''')
+        self._owns_conn = conn is None
+        self.conn = profiles.connect(db_path) if conn is None else conn
+        self.cursor = tracing.cursor(self.conn)
+        self.cursor.execute(SQL.create_table)
         self.conn.commit()
 
     def __enter__(self, *a, **k):
         return self
 
     def __exit__(self, *a, **k):
-        self.conn.close()
+        self.cursor.close()
+        if self._owns_conn:
+            self.conn.close()
+
+    def count(self) -> int:
+        """The amount of Foods (as in iter_values)"""
+        self.cursor.execute(SQL.count)
+        return self.cursor.fetchone()[0]
 
     def get_all_foods(self) -> list[Food]:
-        self.cursor.execute("SELECT * FROM food")
-        return [Food(*x) for x in self.cursor.fetchall() if x and x[0]]
+        self.cursor.execute(SQL.all_foods)
+        return [foods.get(x) for x in self.cursor.fetchall() if x and x[0]]
+
+    def iter_values(self, batch_size: int = 1000) -> Iterator[tuple]:
+        """The values (as Food.values) of all the Foods - fetched in batches, without building Foods."""
+        cursor = tracing.cursor(self.conn)  # (self.cursor stays free while iterating)
+        try:
+            cursor.execute(SQL.all_values)
+            while rows := cursor.fetchmany(batch_size):
+                yield from rows
+        finally:
+            cursor.close()
+
+    def get_foods_page(self, after: Optional[tuple] = None, order_by: str = 'Name', descending: bool = False,
+                       filter_by: str = None, filter_text: str = '',
+                       limit: int = 50) -> tuple[list[Food], Optional[tuple]]:
+        """Get a page of Foods sorted by a column of Food.columns() (with keyset pagination).
+        after - the key returned with the previous page (None for the first page).
+        filter_by + filter_text - only Foods where the column matches the text (see _filter_clause)
+        Returns the Foods of the page and the key for getting the next page."""
+        expression = COLUMN_EXPRESSIONS[order_by]
+        conditions, params = ["name != ''"], []
+        if filter_text:
+            condition, filter_params = _filter_clause(COLUMN_EXPRESSIONS[filter_by or order_by], filter_text)
+            conditions.append(condition)
+            params += filter_params
+        if after is not None:
+            op = '<' if descending else '>'
+            conditions.append(f'({expression} {op} ? OR ({expression} = ? AND name {op} ?))')
+            params += (after[0], after[0], after[1])
+        direction = 'DESC' if descending else 'ASC'
+        cmd = f"""SELECT *, {expression} FROM food
+                  WHERE {' AND '.join(conditions)}
+                  ORDER BY {expression} {direction}, name {direction}
+                  LIMIT ?"""
+        self.cursor.execute(cmd, (*params, limit))
+        rows = self.cursor.fetchall()
+        if not rows:
+            return [], after
+        *_, last = rows
+        return [foods.get(row[:-1]) for row in rows], (last[-1], last[0])
 
     def get_all_food_names(self) -> list[str]:
-        self.cursor.execute("SELECT name FROM food")
+        self.cursor.execute(SQL.all_names)
         return [str(x) for f in self.cursor.fetchall() for x in f if x]
 
     def get_food_by_name(self, name: str):
-        cmd = f" SELECT * FROM food  WHERE `name` = '{name}'"
-        self.cursor.execute(cmd)
-        return Food(*(self.cursor.fetchone() or ()))
+        self.cursor.execute(SQL.food_by_name, (name,))
+        row = self.cursor.fetchone()
+        if row is None:
+            raise ValueError(f'No Food named: {name}')
+        return foods.get(row)
 
     def get_food_by_id(self, id_: str):
-        cmd = f" SELECT * FROM food WHERE `id` = '{id_}'"
-        self.cursor.execute(cmd)
-        return Food(*self.cursor.fetchone())
+        self.cursor.execute(SQL.food_by_id, (id_,))
+        return foods.get(self.cursor.fetchone())
 
     def add_food(self, food: Food, update: bool = False):
-        """update => existing Foods are updated"""
-        or_update = 'OR UPDATE' if update else ''
-        cmd = f'INSERT {or_update} INTO food Values {astuple(food)}'
-        self.cursor.execute(cmd, asdict(food))
+        """update => existing Foods are replaced"""
+        self.cursor.execute(SQL.insert_or_replace if update else SQL.insert, astuple(food))
         self.conn.commit()
+        changes.publish(changes.FOOD, names=[food.name])
+
+    def add_foods(self, new_foods: Iterable[Food], update: bool = False, commit: bool = True) -> int:
+        """Add many Foods in a single transaction (update => existing Foods are replaced).
+        commit=False => the transaction is left to the caller (who publishes the change after committing).
+        Returns the amount added."""
+        count = 0
+
+        def _rows():
+            nonlocal count
+            for food in new_foods:
+                count += 1
+                yield astuple(food)
+
+        try:
+            self.cursor.executemany(SQL.insert_or_replace if update else SQL.insert, _rows())
+            if commit:
+                self.conn.commit()
+        except BaseException:  # (e.g. jobs.Cancelled raised by the rows) - nothing is added
+            self.conn.rollback()
+            raise
+        if commit:
+            changes.publish(changes.FOOD)  # (too many names to list)
+        return count
 
     def remove(self, names: Optional[str, list[str]]) -> None:
         if isinstance(names, str):
@@ -103,30 +267,18 @@ class FoodDB:
         if not names:
             return
 
-        def it2str(tp: Iterable):
-            """Helper function  - parses iterable to SQL string"""
-            return '({})'.format(','.join(f"'{x}'" for x in tp))
-
-        # -- CHECK FOR references in Entries
-        cmd = f"""SELECT name FROM food
-                    inner join meal_entries  
-                  WHERE meal_entries.meal_id = food.id
-                    AND name in {it2str(names)}"""
-        self.cursor.execute(cmd)
-        to_clear_name = [x for tp in self.cursor.fetchall() for x in tp]
-        to_delete = [n for n in names if n not in to_clear_name]
-
-        if to_delete:
-            cmd = f"""DELETE FROM food 
-                    WHERE `name` in {it2str(to_delete)};"""
-            print(cmd)
-            self.cursor.execute(cmd)
+        # The names are loaded into a temp table (no SQL expression/variable limits on the amount of names),
+        # and deleted with a single semi-join on the primary key - in one transaction.
+        # (the meal-entries keep a snapshot of their Food, so referenced Foods are removed as well)
+        self.cursor.execute(SQL.create_removed)
+        try:
+            self.cursor.executemany(SQL.insert_removed, ((name,) for name in names))
+            self.cursor.execute(SQL.delete_removed)
             self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        finally:
+            self.cursor.execute(SQL.drop_removed)
 
-        if to_clear_name:
-            cmd = f"""UPDATE food
-                        SET name = ''
-                      WHERE name in {it2str(to_clear_name)};"""
-            print(cmd)
-            self.cursor.execute(cmd)
-            self.conn.commit()
+        changes.publish(changes.FOOD, names=names)
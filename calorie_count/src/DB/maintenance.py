@@ -0,0 +1,197 @@
+"""This module holds the idle-time maintenance of the app DB "MaintenanceScheduler".
+After months of inserts and deletes the DB gets fragmented and its query plans go stale, so when the App is idle
+(or being paused) the due TASKS run in small time-boxed slices:
+    - A slice runs the due tasks until its budget (seconds) is over - a statement still running then is
+      interrupted (SQLite progress handler) and the task is retried on a later slice.
+    - Tasks that can't resume (a single long statement - e.g. integrity_check) start over when interrupted,
+      so they only run in long slices (on pause) or without a budget.
+    - A task interrupted (or busy) is backed off - skipped for BACKOFF seconds, doubled on each interrupt in a row.
+    - When each task last completed is recorded in the DB (table 'maintenance'), a task is due once its interval passed.
+    - 'run_in_background' runs a slice on a worker thread - the UI never waits for it.
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime as dt
+from datetime import timedelta
+from typing import Callable, Iterable, Optional
+
+from calorie_count.src.DB import profiles
+from calorie_count.src.DB.statements import Statements
+from calorie_count.src.utils import config
+
+logger = logging.getLogger(__name__)
+
+VACUUM_PAGES = 256  # free pages released per incremental vacuum statement
+BACKOFF = 60  # (seconds) a task interrupted is skipped for - doubled on each interrupt in a row
+MAX_BACKOFF = 6 * 60 * 60  # (seconds)
+
+SQL = Statements(
+    create_table='''CREATE TABLE if not exists maintenance(
+                        task text PRIMARY KEY,
+                        last_run text
+                    )''',
+    last_runs="SELECT task, last_run FROM maintenance",
+    set_last_run="INSERT OR REPLACE INTO maintenance VALUES (?, ?)",
+    optimize="PRAGMA optimize",
+    analyze="ANALYZE",
+    auto_vacuum="PRAGMA auto_vacuum",
+    freelist_count="PRAGMA freelist_count",
+    incremental_vacuum=f"PRAGMA incremental_vacuum({VACUUM_PAGES})",
+    checkpoint="PRAGMA wal_checkpoint(PASSIVE)",
+    quick_check="PRAGMA quick_check",
+)
+
+
+@dataclass(frozen=True)
+class Task:
+    """A maintenance task - run(conn) returns True when it completed (False - more work left for the next slice).
+    resumable - the work done by an interrupted run is kept (False - it starts over, see MaintenanceScheduler.run)."""
+    name: str
+    interval: timedelta
+    run: Callable[[sqlite3.Connection], bool]
+    resumable: bool = True
+
+
+def _optimize(conn: sqlite3.Connection) -> bool:
+    conn.execute(SQL.optimize).fetchall()
+    return True
+
+
+def _analyze(conn: sqlite3.Connection) -> bool:
+    conn.execute(SQL.analyze)
+    conn.commit()
+    return True
+
+
+def _incremental_vacuum(conn: sqlite3.Connection) -> bool:
+    """Release free pages (only DBs created with auto_vacuum=INCREMENTAL can)."""
+    if conn.execute(SQL.auto_vacuum).fetchone()[0] != 2:
+        return True
+    conn.execute(SQL.incremental_vacuum).fetchall()
+    conn.commit()
+    return conn.execute(SQL.freelist_count).fetchone()[0] == 0
+
+
+def _checkpoint(conn: sqlite3.Connection) -> bool:
+    """Copy the WAL into the DB (without waiting for readers). A no-op unless the DB is in WAL mode."""
+    busy, *_ = conn.execute(SQL.checkpoint).fetchone()
+    return not busy
+
+
+def _integrity_check(conn: sqlite3.Connection) -> bool:
+    problems = [problem for problem, in conn.execute(SQL.quick_check).fetchall()]
+    if problems != ['ok']:
+        logger.error(f'Maintenance: the DB failed its integrity check: {problems[:10]}')
+    return True
+
+
+TASKS = (
+    Task('wal_checkpoint', timedelta(minutes=10), _checkpoint),
+    Task('optimize', timedelta(days=1), _optimize),
+    Task('incremental_vacuum', timedelta(days=1), _incremental_vacuum),
+    Task('analyze', timedelta(days=7), _analyze, resumable=False),
+    Task('integrity_check', timedelta(days=7), _integrity_check, resumable=False),
+)
+
+
+class MaintenanceScheduler:
+    """Runs the due maintenance tasks of a DB in time-boxed slices."""
+
+    def __init__(self, db_path: str = None, tasks: Iterable[Task] = TASKS):
+        self.db_path = db_path
+        self.tasks = tuple(tasks)
+        self._thread: Optional[threading.Thread] = None
+        self._backoff: dict[str, tuple[int, float]] = {}  # task -> (interrupts in a row, skipped until - monotonic)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = profiles.connect(self.db_path or config.get_db_path())
+        conn.execute(SQL.create_table)
+        conn.commit()
+        return conn
+
+    def last_runs(self) -> dict[str, dt]:
+        """When each task last completed"""
+        conn = self._connect()
+        try:
+            return {task: dt.fromisoformat(last_run) for task, last_run in conn.execute(SQL.last_runs)}
+        finally:
+            conn.close()
+
+    def due(self, now: dt = None) -> list[Task]:
+        """The tasks whose interval passed since they last completed (in order)"""
+        now = now or dt.now()
+        last_runs = self.last_runs()
+        return [task for task in self.tasks
+                if task.name not in last_runs or now - last_runs[task.name] >= task.interval]
+
+    def run(self, budget: Optional[float] = 0.05, long: bool = False) -> list[str]:
+        """Run the due tasks within the budget (seconds, None - no budget). Returns the names of the tasks completed.
+        long - a long slice (e.g. on pause): the tasks that can't resume run too (they always run without a budget)."""
+        deadline = time.perf_counter() + budget if budget is not None else None
+
+        def over_budget() -> bool:
+            return deadline is not None and time.perf_counter() > deadline
+
+        done = []
+        conn = self._connect()
+        conn.set_progress_handler(over_budget, 1000)  # (interrupts the statement running)
+        try:
+            for task in self.due():
+                if over_budget():
+                    break
+                if not (task.resumable or long or budget is None) or self._backing_off(task):
+                    continue
+                try:
+                    completed = task.run(conn)
+                except sqlite3.OperationalError as e:  # interrupted / the DB is busy - retried on a later slice
+                    conn.rollback()
+                    self._back_off(task, e)
+                    continue
+                self._backoff.pop(task.name, None)
+                if completed:
+                    conn.set_progress_handler(None, 0)  # (recorded even if the budget just ran out)
+                    conn.execute(SQL.set_last_run, (task.name, dt.now().isoformat()))
+                    conn.commit()
+                    conn.set_progress_handler(over_budget, 1000)
+                    done.append(task.name)
+        finally:
+            conn.close()
+        return done
+
+    def _backing_off(self, task: Task) -> bool:
+        _, until = self._backoff.get(task.name, (0, 0))
+        return time.monotonic() < until
+
+    def _back_off(self, task: Task, error: sqlite3.OperationalError) -> None:
+        interrupts = self._backoff.get(task.name, (0, 0))[0] + 1
+        delay = min(BACKOFF * 2 ** (interrupts - 1), MAX_BACKOFF)
+        self._backoff[task.name] = interrupts, time.monotonic() + delay
+        logger.info(f'Maintenance: {task.name} postponed for {delay}s ({error})')
+
+    def run_in_background(self, budget: Optional[float] = 0.05, long: bool = False) -> bool:
+        """Run a slice (see 'run') on a worker thread. Returns False if a slice is still running."""
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        self._thread = threading.Thread(target=self._run_logged, args=(budget, long), name='db-maintenance',
+                                        daemon=True)
+        self._thread.start()
+        return True
+
+    def join(self, timeout: float = None) -> None:
+        """Wait for the slice running in the background (if any)."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run_logged(self, budget: Optional[float], long: bool) -> None:
+        try:
+            done = self.run(budget, long)
+        except sqlite3.Error:
+            logger.exception('Maintenance: slice failed')
+            return
+        if done:
+            logger.info(f'Maintenance: {", ".join(done)} done')
@@ -2,47 +2,70 @@
 Parameters to and from this DB are passed with instances of the  dataclass "MealEntry". """
 from __future__ import annotations
 
-import sqlite3
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import datetime as dt
+from datetime import timedelta
+from typing import ClassVar, Iterable, Iterator
+
+from calorie_count.src.DB import changes, profiles, tracing, write_behind
 from calorie_count.src.DB.food_db import Food, FoodDB
+from calorie_count.src.DB.statements import Statements, placeholders
 from calorie_count.src.utils import config
 from calorie_count.src.utils.utils import str2iso
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class MealEntry:
-    """This dataclass represents the data in the MealEntries DB"""
+    """This dataclass represents the data in the MealEntries DB (immutable).
+    The nutrients are a snapshot of the Food scaled to the entry's portion, taken when the entry is created
+    (and stored with it) - so editing or removing the Food doesn't change the history."""
     name: str = field(default=None)
     portion: float = field(default=None)
     date: str = field(default=None)
-    food: Food = field(default=None)
-    id: str = field(default=None)  # The ID is added only when the entry is added to the DB
-    FOOD_DB_PATH: str = None  # init function for FoodDB
+    food: Food = field(default=None, compare=False)  # (None for entries loaded from the DB)
+    id: str = field(default=None)  # The ID is given only to the entry stored (see MealEntryDB.add_meal_entry)
+    proteins: float = field(default=None)
+    fats: float = field(default=None)
+    carbs: float = field(default=None)
+    sugar: float = field(default=None)
+    sodium: float = field(default=None)
+    water: float = field(default=None)
+    FOOD_DB_PATH: ClassVar[str] = None  # init function for FoodDB
 
     def __post_init__(self):
+        if self.proteins is not None:  # (a snapshot - e.g. loaded from the DB)
+            return
         assert self.name or self.food, 'name or meal missing'
+        _set = object.__setattr__  # (frozen - the defaults are only set on creation)
         if self.name and not self.food:
             with FoodDB(self.FOOD_DB_PATH) as fdb:
-                self.food = fdb.get_food_by_name(self.name)
+                _set(self, 'food', fdb.get_food_by_name(self.name))
         if self.food and not self.name:
             # means nameless meal-entry
             with FoodDB(self.FOOD_DB_PATH) as fdb:
                 fdb.add_food(food=self.food)
-                print(f'Added to MealDB: {self.food}.')
+            _set(self, 'name', self.food.name)
 
         if not self.date:
-            self.date = dt.now().date().isoformat()
+            _set(self, 'date', dt.now().date().isoformat())
 
         if not self.portion:
-            self.portion = self.food.portion
-        elif self.portion != self.food.portion:
-            ratio = self.portion / self.food.portion
-            self.food.carbs *= ratio
-            self.food.fats *= ratio
-            self.food.proteins *= ratio
-            self.food.sodium *= ratio
-            self.food.sugar *= ratio
+            _set(self, 'portion', self.food.portion)
+
+        # -- Snapshot of the nutrients scaled to the portion
+        ratio = self.portion / self.food.portion if self.food.portion else 1
+        for attr in ('proteins', 'fats', 'carbs', 'sugar', 'sodium', 'water'):
+            _set(self, attr, getattr(self.food, attr) * ratio)
+
+    @property
+    def cals(self) -> float:
+        """Calculate the calories of the entry."""
+        return self.proteins * 4 + self.carbs * 4 + self.fats * 9
+
+    @property
+    def nutrients(self) -> tuple[float, ...]:
+        """The snapshot as stored in the DB (NUTRIENT_COLUMNS)"""
+        return self.proteins, self.fats, self.carbs, self.sugar, self.sodium, self.water, self.cals
 
     @staticmethod
     def columns() -> tuple[str, ...]:
@@ -52,8 +75,95 @@ class MealEntry:
 
     @property
     def values(self) -> tuple:
-        return self.date, self.name, self.portion, self.food.proteins, self.food.fats, self.food.carbs, \
-            self.food.sugar, self.food.sodium, self.food.water, self.food.cals
+        return self.date, self.name, self.portion, self.proteins, self.fats, self.carbs, \
+            self.sugar, self.sodium, self.water, self.cals
+
+
+# The snapshot columns of meal_entries (scaled by the entry's portion), also in get_columns_between_dates
+NUTRIENT_COLUMNS = ('protein', 'fats', 'carbs', 'sugar', 'sodium', 'water', 'calories')
+SCHEMA_VERSION = 2  # (PRAGMA user_version) 1 - meal_entries with the name and NUTRIENT_COLUMNS snapshot
+#                                           2 - the insertion sequence of the entries (meal_entries_seq)
+
+
+def _coalesced(columns: tuple[str, ...]) -> str:
+    """Helper function - the columns' SQL with 0 for NULL (entries never backfilled)"""
+    return ', '.join(f'COALESCE({c}, 0)' for c in columns)
+
+
+SQL = Statements(
+    create_table='''CREATE TABLE if not exists meal_entries(
+                        meal_id text,
+                        portion real,
+                        date text,
+                        id text,
+                        name text,
+                        protein real,
+                        fats real,
+                        carbs real,
+                        sugar real,
+                        sodium real,
+                        water real,
+                        calories real
+                    )''',
+    create_id_index="CREATE INDEX if not exists meal_entries_id ON meal_entries(id)",
+    # The order the entries were added in - never reused (AUTOINCREMENT), unlike the ids (the wall-clock time)
+    create_seq_table='''CREATE TABLE if not exists meal_entries_seq(
+                            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                            entry_id text
+                        )''',
+    create_seq_index="CREATE INDEX if not exists meal_entries_seq_entry ON meal_entries_seq(entry_id)",
+    create_seq_trigger='''CREATE TRIGGER if not exists meal_entries_sequenced AFTER INSERT ON meal_entries
+                          BEGIN
+                              INSERT INTO meal_entries_seq(entry_id) VALUES (NEW.id);
+                          END''',
+    create_unseq_trigger='''CREATE TRIGGER if not exists meal_entries_unsequenced AFTER DELETE ON meal_entries
+                            BEGIN
+                                DELETE FROM meal_entries_seq WHERE entry_id = OLD.id;
+                            END''',
+    backfill_seq="""INSERT INTO meal_entries_seq(entry_id)
+                    SELECT id FROM meal_entries
+                     WHERE id NOT IN (SELECT entry_id FROM meal_entries_seq)
+                     ORDER BY id""",
+    insert=f"INSERT INTO meal_entries VALUES ({placeholders(5 + len(NUTRIENT_COLUMNS))})",
+    entries_between=f"""SELECT name, portion, date, id, {_coalesced(NUTRIENT_COLUMNS[:-1])}
+                          FROM meal_entries
+                         WHERE date BETWEEN ? AND ?""",
+    columns_between=f"""SELECT date, COALESCE(portion, 0), {_coalesced(NUTRIENT_COLUMNS)}
+                          FROM meal_entries
+                         WHERE date BETWEEN ? AND ?
+                         ORDER BY date""",
+    all_values=f"""SELECT date, name, portion, {_coalesced(NUTRIENT_COLUMNS)}
+                     FROM meal_entries
+                    ORDER BY rowid""",
+    values_between_seqs=f"""SELECT date, name, portion, {_coalesced(NUTRIENT_COLUMNS)}
+                              FROM meal_entries_seq
+                              JOIN meal_entries ON id = entry_id
+                             WHERE seq > ? AND seq <= ?
+                             ORDER BY seq""",
+    count="SELECT COUNT(*) FROM meal_entries",
+    count_between_seqs="""SELECT COUNT(*)
+                            FROM meal_entries_seq
+                            JOIN meal_entries ON id = entry_id
+                           WHERE seq > ? AND seq <= ?""",
+    last_seq="SELECT COALESCE(MAX(seq), 0) FROM meal_entries_seq",
+    first_last_dates="SELECT MIN(date), MAX(date) FROM meal_entries",
+    dates_by_id="SELECT date FROM meal_entries WHERE `id` = ?",
+    delete_by_id="DELETE FROM meal_entries WHERE `id` = ?",
+    user_version="PRAGMA user_version",
+    columns_info="PRAGMA table_info(meal_entries)",
+    food_table_exists="SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'food'",
+)
+
+
+def daily_sums(columns: dict) -> dict:
+    """Group the columns (of MealEntryDB.get_columns_between_dates) by date and sum them.
+    Returns the same keys - 'date' holds each date once (sorted), the rest their daily sums."""
+    import numpy as np
+
+    dates, starts = np.unique(columns['date'], return_index=True)  # (columns are sorted by date)
+    if not len(dates):
+        return {k: v[:0] for k, v in columns.items()}
+    return {'date': dates, **{k: np.add.reduceat(v, starts) for k, v in columns.items() if k != 'date'}}
 
 
 class MealEntryDB:
@@ -65,49 +175,176 @@ class MealEntryDB:
         self.MealEntry.FOOD_DB_PATH = db_path = config.get_db_path()
 
         # Connect to DB (or create one if none exists)
-        self.conn = sqlite3.connect(db_path, timeout=15)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute('''CREATE TABLE if not exists meal_entries(
-                          meal_id text,
-                          portion real,
-                          date text,
-                          id text
-                          )''')
+        self.conn = profiles.connect(db_path)
+        self.cursor = tracing.cursor(self.conn)
+        self.cursor.execute(SQL.create_table)
+        self.cursor.execute(SQL.create_id_index)  # (deletes and incremental exports look entries up by id)
+        for statement in (SQL.create_seq_table, SQL.create_seq_index, SQL.create_seq_trigger,
+                          SQL.create_unseq_trigger):
+            self.cursor.execute(statement)
+        self.conn.commit()
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Migrate a DB of an older schema (adding and backfilling the snapshot columns)."""
+        self.cursor.execute(SQL.user_version)
+        if self.cursor.fetchone()[0] >= SCHEMA_VERSION:
+            return
+        self.cursor.execute('BEGIN IMMEDIATE')  # (one connection migrates, the rest wait and skip)
+        self.cursor.execute(SQL.user_version)
+        if self.cursor.fetchone()[0] < SCHEMA_VERSION:
+            self.cursor.execute(SQL.columns_info)
+            existing = {row[1] for row in self.cursor.fetchall()}
+            for column in ('name',) + NUTRIENT_COLUMNS:
+                if column not in existing:
+                    kind = 'text' if column == 'name' else 'real'
+                    self.cursor.execute(f'ALTER TABLE meal_entries ADD COLUMN {column} {kind}')
+            self.backfill_snapshots()
+            self.cursor.execute(SQL.backfill_seq)  # (the entries added before the sequence - in the order of their ids)
+            self.cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
         self.conn.commit()
 
+    def backfill_snapshots(self) -> None:
+        """Fill the snapshot columns of the entries missing them from their Foods (not committed)."""
+        self.cursor.execute(SQL.food_table_exists)
+        if not self.cursor.fetchone():
+            return
+        ratio = '(CASE WHEN me.portion AND f.portion THEN me.portion / f.portion ELSE 1 END)'
+        # (the name of the Food - or its id, if the Food's name was cleared)
+        expressions = ["COALESCE(NULLIF(f.name, ''), me.meal_id)",
+                       *(f'COALESCE(f.{c}, 0) * {ratio}' for c in NUTRIENT_COLUMNS[:-1]),
+                       f'(COALESCE(f.protein, 0) * 4 + COALESCE(f.carbs, 0) * 4 + COALESCE(f.fats, 0) * 9) * {ratio}']
+        columns = ('name',) + NUTRIENT_COLUMNS
+        # (joined once into a temp table keyed by rowid - correlated lookups on food.id would scan it per entry)
+        self.cursor.execute(f'CREATE TEMP TABLE snapshots(entry INTEGER PRIMARY KEY, {", ".join(columns)})')
+        self.cursor.execute(f'''INSERT INTO snapshots
+                                SELECT me.rowid, {", ".join(expressions)}
+                                  FROM meal_entries me
+                                  JOIN food f ON f.id = me.meal_id
+                                 WHERE me.calories IS NULL''')
+        assignments = ', '.join(f'{c} = (SELECT {c} FROM snapshots WHERE entry = meal_entries.rowid)' for c in columns)
+        self.cursor.execute(f'''UPDATE meal_entries SET {assignments}
+                                WHERE rowid IN (SELECT entry FROM snapshots)''')
+        self.cursor.execute('DROP TABLE snapshots')
+        # (the Food was deleted - nothing to snapshot, but the entry is still named)
+        self.cursor.execute('UPDATE meal_entries SET name = meal_id WHERE name IS NULL')
+
     def __enter__(self, *a, **k):
         return self
 
     def __exit__(self, *a, **k):
+        self.cursor.close()
         self.conn.close()
 
-    def add_meal_entry(self, entry: MealEntry):
-        entry.id = dt.now().isoformat()
-        cmd = f"INSERT INTO meal_entries Values ('{entry.food.id}', {entry.portion}, " \
-              f"'{entry.date}', '{entry.id}')"
-        print(cmd)
-        self.cursor.execute(cmd, {'meal_id': entry.food.id,
-                                  'portion': entry.portion,
-                                  'date': entry.date,
-                                  'id': entry.id})
-        self.conn.commit()
+    def add_meal_entry(self, entry: MealEntry) -> MealEntry:
+        """Add an entry (queued if the write-behind queue is enabled, see write_behind.py).
+        Returns the entry stored - a copy of 'entry' with its new id."""
+        entry = replace(entry, id=dt.now().isoformat())
+        queue = write_behind.get_queue()
+        if queue is not None:
+            queue.insert(entry)
+        else:
+            self._insert(entry)
+            self.conn.commit()
+        changes.publish(changes.MEAL_ENTRIES, dates=[entry.date])
+        return entry
+
+    def add_meal_entries(self, entries: Iterable[MealEntry], commit: bool = True) -> int:
+        """Add many entries in a single transaction (written directly, not queued). Returns the amount added.
+        commit=False => the transaction is left to the caller (who publishes the change after committing)."""
+        write_behind.flush()
+        now, count = dt.now(), 0
+
+        def _rows():
+            nonlocal count
+            for entry in entries:
+                entry_id = (now + timedelta(microseconds=count)).isoformat()  # (unique within the batch)
+                count += 1
+                yield self._row(replace(entry, id=entry_id))
+
+        try:
+            self.cursor.executemany(SQL.insert, _rows())
+            if commit:
+                self.conn.commit()
+        except BaseException:  # (e.g. jobs.Cancelled raised by the entries) - nothing is added
+            self.conn.rollback()
+            raise
+        if commit:
+            changes.publish(changes.MEAL_ENTRIES)  # (too many dates to list)
+        return count
+
+    @staticmethod
+    def _row(entry: MealEntry) -> tuple:
+        """The row of the entry in meal_entries (the id of an entry loaded without its Food is its name)"""
+        meal_id = entry.food.id if entry.food else entry.name
+        return meal_id, entry.portion, entry.date, entry.id, entry.name, *entry.nutrients
+
+    def _insert(self, entry: MealEntry) -> None:
+        self.cursor.execute(SQL.insert, self._row(entry))
 
     def get_entries_between_dates(self, start_date: str, end_date: str) -> list[MealEntry]:
-        cmd = f'SELECT * FROM meal_entries WHERE date BETWEEN "{start_date}" AND "{end_date}"'
-        self.cursor.execute(cmd)
-        ret = []
-        for entry in self.cursor.fetchall():
-            with FoodDB() as fdb:
-                meal_id, portion, date, e_id = entry
-                meal = fdb.get_food_by_id(meal_id)
-            ret.append(self.MealEntry(name=meal.name, food=meal, portion=portion, date=date, id=e_id))
+        queue = write_behind.get_queue()
+        if queue is not None:  # (taken before reading - an operation committed meanwhile is in both)
+            queued, deleted = queue.overlay(start_date, end_date)
+        self.cursor.execute(SQL.entries_between, (start_date, end_date))
+        ret = [self.MealEntry(name, portion, date, None, e_id, *nutrients)
+               for name, portion, date, e_id, *nutrients in self.cursor.fetchall()]
+        if queue is not None:
+            ids = {e.id for e in ret}
+            ret = [e for e in ret + [e for e in queued if e.id not in ids] if e.id not in deleted]
         return ret
 
+    def iter_values(self, batch_size: int = 1000, seqs: tuple[int, int] = None) -> Iterator[tuple]:
+        """The values (as MealEntry.values) of the entries - fetched in batches, without building MealEntries.
+        seqs - (after, until) only the entries added with after < sequence <= until (in the order they were added,
+        see get_last_seq), None - all of them."""
+        write_behind.flush()
+        cursor = tracing.cursor(self.conn)  # (self.cursor stays free while iterating)
+        try:
+            if seqs is None:
+                cursor.execute(SQL.all_values)
+            else:
+                cursor.execute(SQL.values_between_seqs, seqs)
+            while rows := cursor.fetchmany(batch_size):
+                yield from rows
+        finally:
+            cursor.close()
+
+    def count(self, seqs: tuple[int, int] = None) -> int:
+        """The amount of entries (as in iter_values)"""
+        write_behind.flush()
+        if seqs is None:
+            self.cursor.execute(SQL.count)
+        else:
+            self.cursor.execute(SQL.count_between_seqs, seqs)
+        return self.cursor.fetchone()[0]
+
+    def get_last_seq(self) -> int:
+        """The sequence of the newest entry (0 - none yet). Each entry added gets the next one (meal_entries_seq) -
+        unlike the ids (the wall-clock time) it never goes back, e.g. when the clock is changed."""
+        write_behind.flush()
+        self.cursor.execute(SQL.last_seq)
+        return self.cursor.fetchone()[0]
+
+    def get_columns_between_dates(self, start_date: str, end_date: str) -> dict:
+        """Get the entries between dates as numpy column arrays (sorted by date) - for vectorized analytics.
+        keys: 'date' (datetime64[D]), 'portion' (g) and NUTRIENT_COLUMNS (already scaled by the portion).
+        Unlike get_entries_between_dates no MealEntry objects are built."""
+        import numpy as np
+
+        write_behind.flush()
+        self.cursor.execute(SQL.columns_between, (start_date, end_date))
+        dtype = [('date', 'U10'), ('portion', 'f8')] + [(c, 'f8') for c in NUTRIENT_COLUMNS]
+        rows = np.fromiter(self.cursor, dtype=dtype)
+        columns = {name: rows[name] for name, _ in dtype}
+        columns['date'] = columns['date'].astype('datetime64[D]')
+        return columns
+
     def get_first_last_dates(self) -> tuple[dt.date, dt.date]:
         """Get the first and the last date of all entries"""
 
-        cmd = f'SELECT MIN(date), MAX(date) FROM meal_entries'
-        self.cursor.execute(cmd)
+        write_behind.flush()
+        self.cursor.execute(SQL.first_last_dates)
         start, end = self.cursor.fetchone()
         if not any((start, end)):
             today = str2iso(dt.now().date().isoformat())
@@ -117,9 +354,18 @@ class MealEntryDB:
         return start, end
 
     def delete_entry(self, time_stamp: str) -> None:
-        """remove an entry based on it's id """
-        cmd = 'DELETE FROM meal_entries ' \
-              f"WHERE `id` = '{time_stamp}'"
-        print(cmd)
-        self.cursor.execute(cmd)
-        self.conn.commit()
+        """remove an entry based on it's id (queued if the write-behind queue is enabled)"""
+        queue = write_behind.get_queue()
+        queued_date = queue.delete(time_stamp) if queue is not None else None
+        if queued_date is not None:
+            dates = [queued_date]
+        else:
+            self.cursor.execute(SQL.dates_by_id, (time_stamp,))
+            dates = [date for date, in self.cursor.fetchall()]
+        if queue is None:
+            self._delete(time_stamp)
+            self.conn.commit()
+        changes.publish(changes.MEAL_ENTRIES, dates=dates)
+
+    def _delete(self, time_stamp: str) -> None:
+        self.cursor.execute(SQL.delete_by_id, (time_stamp,))
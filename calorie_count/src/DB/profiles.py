@@ -0,0 +1,86 @@
+"""This module holds the connection profiles of the DB classes (the PRAGMAs applied when a connection is opened).
+    - The DB classes open their connections with 'connect', which applies the current profile.
+    - Select the profile with 'set_profile' (see config.get_db_profile), or temporarily with 'using'
+      (e.g. 'bulk-import' while building a DB).
+    - The "default" profile applies nothing - SQLite's defaults (rollback journal, synchronous FULL, small cache).
+
+Note: The journal mode WAL is persistent (kept in the DB file), the rest are per connection.
+    Leaving WAL needs the DB to have no other connections - if it can't, the journal mode is left as is."""
+from __future__ import annotations
+
+import logging
+import sqlite3
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Profile:
+    """The PRAGMAs of a connection profile (None - SQLite's default is left)"""
+    journal_mode: Optional[str] = None  # DELETE / WAL / OFF ...
+    synchronous: Optional[str] = None  # FULL / NORMAL / OFF
+    cache_size: Optional[int] = None  # (pages, negative - KiB)
+    mmap_size: Optional[int] = None  # (bytes)
+    temp_store: Optional[str] = None  # DEFAULT / FILE / MEMORY
+    auto_vacuum: Optional[str] = None  # NONE / FULL / INCREMENTAL (only for new DBs, see maintenance.py)
+
+    def pragmas(self) -> dict[str, object]:
+        """The PRAGMAs to set (in order - auto_vacuum before anything is written, then the journal mode)"""
+        names = ('auto_vacuum', 'journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store')
+        return {name: getattr(self, name) for name in names if getattr(self, name) is not None}
+
+
+DEFAULT = 'default'
+PROFILES = {
+    DEFAULT: Profile(),
+    # Readers don't block the writer (and vice versa), a commit doesn't fsync (durable on checkpoint)
+    'interactive': Profile('WAL', 'NORMAL', cache_size=-16_000, mmap_size=64 * 2 ** 20, temp_store='MEMORY',
+                           auto_vacuum='INCREMENTAL'),
+    # Building/importing a DB - no journal, no fsync (a crash mid-way can corrupt the DB - build from scratch)
+    'bulk-import': Profile('OFF', 'OFF', cache_size=-64_000, temp_store='MEMORY'),
+    # Old phones - WAL with a small cache and no memory-mapped I/O
+    'low-memory': Profile('WAL', 'NORMAL', cache_size=-512, mmap_size=0, temp_store='FILE', auto_vacuum='INCREMENTAL'),
+}
+_profile = DEFAULT
+
+
+def set_profile(name: str) -> None:
+    """Apply the profile to all the DB connections opened from now on."""
+    global _profile
+    if name not in PROFILES:
+        raise ValueError(f'Unknown DB profile: {name} (expected one of: {", ".join(PROFILES)})')
+    _profile = name
+
+
+def get_profile() -> str:
+    return _profile
+
+
+@contextmanager
+def using(name: str) -> Iterator[None]:
+    """Apply the profile to the connections opened in the 'with' block (then the previous one again)."""
+    previous = get_profile()
+    set_profile(name)
+    try:
+        yield
+    finally:
+        set_profile(previous)
+
+
+def connect(db_path: str, timeout: float = 15, **kwargs) -> sqlite3.Connection:
+    """Open a connection to a DB with the current profile applied."""
+    conn = sqlite3.connect(db_path, timeout=timeout, **kwargs)
+    configure(conn, PROFILES[_profile])
+    return conn
+
+
+def configure(conn: sqlite3.Connection, profile: Profile) -> None:
+    """Set the PRAGMAs of a profile on a connection."""
+    for name, value in profile.pragmas().items():
+        try:
+            conn.execute(f'PRAGMA {name} = {value}').fetchall()
+        except sqlite3.OperationalError as e:  # e.g. leaving WAL while other connections are open
+            logger.warning(f'Could not set PRAGMA {name} = {value} ({e})')
@@ -0,0 +1,25 @@
+"""This module holds the statement layer of the DB classes.
+Each DB module defines its SQL once, as named statements with parameters ('?') - values are never formatted in,
+so values with quotes (e.g. "Ben & Jerry's") are passed as they are.
+Only identifiers from fixed lists (columns, sort order) are formatted into SQL - never user input."""
+from __future__ import annotations
+
+import sqlite3
+
+
+class Statements:
+    """Named SQL statements (as attributes), checked to be complete statements on definition."""
+
+    def __init__(self, **statements: str):
+        for name, sql in statements.items():
+            if not sqlite3.complete_statement(f'{sql};'):
+                raise ValueError(f'Incomplete SQL statement {name}: {sql}')
+            setattr(self, name, sql)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({", ".join(vars(self))})'
+
+
+def placeholders(n: int) -> str:
+    """Helper function - n comma separated parameters (e.g. for VALUES (?, ?, ?))"""
+    return ', '.join('?' * n)
@@ -0,0 +1,132 @@
+"""This module holds the window statistics of the meal-entries "DailyStats".
+Cumulative (prefix) sums of the nutrients per calendar day are kept in memory,
+so the total of any date window is a single subtraction:  cum[end + 1] - cum[start]
+    - Built lazily (a single columnar query of the whole history, see MealEntryDB.get_columns_between_dates).
+    - Kept up to date from the data-change bus: changed days are patched in place.
+      (Food changes don't matter - the entries keep a snapshot of their nutrients.)
+    - Averages are per logged day - days without entries count as zeros in totals, but not as days in averages.
+"""
+from __future__ import annotations
+
+import threading
+from datetime import date
+
+from calorie_count.src.DB import changes
+from calorie_count.src.DB.meal_entry_db import MealEntryDB, NUTRIENT_COLUMNS, daily_sums
+
+COLUMNS = ('portion',) + NUTRIENT_COLUMNS
+
+
+def _day(day: str | date):
+    """Helper function - a date (or ISO string, with or without time) as numpy datetime64[D]"""
+    import numpy as np
+    return np.datetime64(str(day)[:10], 'D')
+
+
+class DailyStats:
+    """Prefix sums of the COLUMNS per day (and of the days with entries) over the whole history."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._first = None  # the first day (datetime64[D])
+        self._cum = None  # (days + 1, len(COLUMNS) + 1) - row i: the sums of the days before day i
+        self._dirty: set[str] = set()  # days changed since the sums were built
+        changes.subscribe(changes.MEAL_ENTRIES, self._on_change)
+
+    def close(self) -> None:
+        changes.unsubscribe(changes.MEAL_ENTRIES, self._on_change)
+
+    def invalidate(self) -> None:
+        """Rebuild the sums on the next query."""
+        with self._lock:
+            self._cum = None
+            self._dirty.clear()
+
+    def _on_change(self, table: str, version: int, details: dict) -> None:
+        if details.get('dates') is None:
+            self.invalidate()
+            return
+        with self._lock:
+            self._dirty.update(str(d)[:10] for d in details['dates'])
+
+    @staticmethod
+    def _values(start: str | date, end: str | date):
+        """The dense per-day values between dates: (days, len(COLUMNS) + 1), last column - 1 if the day has entries"""
+        import numpy as np
+
+        with MealEntryDB() as db:
+            daily = daily_sums(db.get_columns_between_dates(str(start)[:10], str(end)[:10]))
+        values = np.zeros(((_day(end) - _day(start)).astype(int) + 1, len(COLUMNS) + 1))
+        idx = (daily['date'] - _day(start)).astype(int)
+        values[idx, :-1] = np.column_stack([daily[c] for c in COLUMNS]) if len(idx) else 0
+        values[idx, -1] = 1
+        return values
+
+    def _build(self) -> None:
+        import numpy as np
+
+        with MealEntryDB() as db:
+            first, last = db.get_first_last_dates()
+        values = self._values(first, last)
+        self._first = _day(first)
+        self._cum = np.zeros((len(values) + 1, values.shape[1]))
+        np.cumsum(values, axis=0, out=self._cum[1:])
+        self._dirty.clear()
+
+    def _ensure(self):
+        """Get the prefix sums - built/patched if needed."""
+        with self._lock:
+            if self._cum is None:
+                self._build()
+            while self._dirty:
+                day = self._dirty.pop()
+                i = (_day(day) - self._first).astype(int)
+                if not 0 <= i < len(self._cum) - 1:  # outside the history built
+                    self._build()
+                    break
+                self._cum[i + 1:] += self._values(day, day)[0] - (self._cum[i + 1] - self._cum[i])
+            return self._cum
+
+    def _sums(self, starts, ends):
+        """The sums of the windows [starts, ends] (datetime64[D] arrays/scalars) - (..., len(COLUMNS) + 1)"""
+        import numpy as np
+
+        cum = self._ensure()
+        n = len(cum) - 1
+        pos_start = np.clip((starts - self._first).astype(int), 0, n)
+        pos_end = np.clip((ends - self._first).astype(int) + 1, 0, n)
+        return cum[pos_end] - cum[pos_start]
+
+    def total(self, start: str | date, end: str | date) -> dict[str, float]:
+        """The totals of the COLUMNS between dates (inclusive), and 'days' - the days with entries."""
+        *sums, days = self._sums(_day(start), _day(end))
+        return {**dict(zip(COLUMNS, map(float, sums))), 'days': int(days)}
+
+    def mean(self, start: str | date, end: str | date) -> dict[str, float]:
+        """The average per logged day of the COLUMNS between dates (0 if no days logged)."""
+        total = self.total(start, end)
+        days = total.pop('days')
+        return {k: v / days if days else 0.0 for k, v in total.items()}
+
+    def daily(self, start: str | date, end: str | date) -> tuple:
+        """The days with entries between dates (datetime64[D] array) and the COLUMNS' sums on them."""
+        import numpy as np
+
+        days = np.arange(_day(start), _day(end) + 1)
+        sums = self._sums(days, days)
+        logged = sums[:, -1] > 0
+        return days[logged], {c: sums[logged, i] for i, c in enumerate(COLUMNS)}
+
+    def rolling_mean(self, days, window: int) -> dict:
+        """The average per logged day of the COLUMNS over the 'window' days ending at each of 'days'
+        (nan where no day was logged)."""
+        import numpy as np
+
+        days = np.asarray(days, dtype='datetime64[D]')
+        sums = self._sums(days - (window - 1), days)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums[:, :-1] / sums[:, -1:]
+        return {c: means[:, i] for i, c in enumerate(COLUMNS)}
+
+
+daily_stats = DailyStats()
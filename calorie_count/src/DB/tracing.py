@@ -0,0 +1,136 @@
+"""This module holds the (pluggable) SQL tracing of the DB classes.
+    - Install a tracer with 'set_tracer'. A tracer is called with every finished statement
+      as (TraceRecord, connection). e.g. SlowQueryLog - keeps the slow statements with their query plans.
+    - The DB classes get their cursors from 'cursor'. While no tracer is installed it is a plain
+      sqlite3 cursor, so tracing costs nothing when disabled.
+
+Note: A statement is "finished" when its rows were fetched (or the cursor executes again / closes),
+    so the duration of a SELECT includes fetching its rows."""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TraceRecord:
+    """A statement executed by the DB"""
+    statement: str
+    parameters: Any
+    duration: float  # (s)
+    rows: int = 0  # rows fetched (SELECT) or changed (INSERT/UPDATE/DELETE)
+    plan: list[str] = field(default=None)  # EXPLAIN QUERY PLAN (only for slow statements)
+
+
+Tracer = Callable[[TraceRecord, sqlite3.Connection], None]
+_tracer: Optional[Tracer] = None
+
+
+def set_tracer(tracer: Optional[Tracer]) -> None:
+    """Install a tracer for all the DB connections opened from now on (None - disable tracing)."""
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    """Get a cursor for a DB class - traced only if a tracer is installed."""
+    if _tracer is None:
+        return conn.cursor()
+    return conn.cursor(TracingCursor)
+
+
+class TracingCursor(sqlite3.Cursor):
+    """sqlite3 Cursor timing its statements and counting their rows for the tracer."""
+
+    _record: TraceRecord = None
+
+    def _finish(self) -> None:
+        record, self._record = self._record, None
+        if record is not None and _tracer is not None:
+            _tracer(record, self.connection)
+
+    def _timed(self, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            if self._record is not None:
+                self._record.duration += time.perf_counter() - start
+
+    def execute(self, sql: str, parameters=()):
+        self._finish()
+        self._record = TraceRecord(sql, parameters, 0)
+        ret = self._timed(super().execute, sql, parameters)
+        self._record.rows = max(self.rowcount, 0)
+        return ret
+
+    def executemany(self, sql: str, seq_of_parameters):
+        self._finish()
+        self._record = TraceRecord(sql, '<many>', 0)
+        ret = self._timed(super().executemany, sql, seq_of_parameters)
+        self._record.rows = max(self.rowcount, 0)
+        return ret
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        elif self._record is not None:
+            self._record.rows += 1
+        return row
+
+    def fetchmany(self, size: int = None):
+        rows = self._timed(super().fetchmany, size or self.arraysize)
+        if self._record is not None:
+            self._record.rows += len(rows)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        if self._record is not None:
+            self._record.rows += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+
+class SlowQueryLog:
+    """A tracer keeping (and logging) the statements slower than a threshold, with their query plans."""
+
+    def __init__(self, threshold: float = 0.05, max_entries: int = 100):
+        self.threshold = threshold  # (s)
+        self.entries: deque[TraceRecord] = deque(maxlen=max_entries)
+
+    def __call__(self, record: TraceRecord, conn: sqlite3.Connection) -> None:
+        if record.duration < self.threshold:
+            return
+        parameters = record.parameters if record.parameters != '<many>' else ()
+        try:
+            plan = conn.execute(f'EXPLAIN QUERY PLAN {record.statement}', parameters).fetchall()
+            record.plan = [detail for *_, detail in plan]
+        except sqlite3.Error as e:  # e.g. connection already closed
+            record.plan = [f'(no plan: {e})']
+        self.entries.append(record)
+        logger.warning(f'Slow query ({record.duration * 1000:.1f}ms, {record.rows} rows): '
+                       f'{" ".join(record.statement.split())} {record.parameters} plan: {record.plan}')
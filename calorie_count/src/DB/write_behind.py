@@ -0,0 +1,172 @@
+"""This module holds the (optional) write-behind queue of the meal-entries "WriteBehindQueue".
+Instead of a commit (and fsync) per tap on the UI thread, inserts and deletes of meal-entries are queued
+and a single writer thread commits them in batches - every 'interval' seconds or 'max_pending' operations.
+    - Enable it with 'enable' (see config.get_write_behind). While disabled MealEntryDB writes synchronously.
+    - Read-your-writes: MealEntryDB.get_entries_between_dates merges the queued operations,
+      the other reads (analytics) 'flush' the queue first.
+    - Flush on App pause/stop - the queue is in memory only.
+    - A batch that fails is kept (and retried on the next round) - 'flush' raises the error meanwhile,
+      so the entries the UI already shows are never silently lost.
+"""
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+INSERT, DELETE = 'insert', 'delete'
+MAX_RETRIES = 20  # of a batch while the DB is busy/locked
+
+
+class WriteBehindQueue:
+    """Queued meal-entry inserts/deletes committed in batches by a single writer thread."""
+
+    def __init__(self, interval: float = 0.3, max_pending: int = 50):
+        self.interval = interval  # (s)
+        self.max_pending = max_pending
+        self._pending: list[tuple[str, object]] = []  # (INSERT, MealEntry) / (DELETE, entry id)
+        self._in_flight: list[tuple[str, object]] = []  # the batch being written
+        self._submitted = self._written = 0  # operations counters (for flush)
+        self._failures, self._error = 0, None  # batches that failed (kept in _pending), the last error
+        self._lock = threading.Condition()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name='meal-entries-writer', daemon=True)
+        self._thread.start()
+
+    def insert(self, entry) -> None:
+        self._submit((INSERT, entry))
+
+    def delete(self, entry_id: str) -> Optional[str]:
+        """Queue a delete of an entry. Returns the date of the entry if it was still queued/being written."""
+        with self._lock:
+            for i, (op, entry) in enumerate(self._pending):
+                if op == INSERT and entry.id == entry_id:  # (never written - just drop it)
+                    del self._pending[i]
+                    self._written += 1  # (done - a flush may be waiting for it)
+                    self._lock.notify_all()
+                    return entry.date
+        date = next((e.date for op, e in self._in_flight if op == INSERT and e.id == entry_id), None)
+        self._submit((DELETE, entry_id))
+        return date
+
+    def _submit(self, operation: tuple[str, object]) -> None:
+        with self._lock:
+            if self._stopped:
+                raise RuntimeError('WriteBehindQueue is closed')
+            self._pending.append(operation)
+            self._submitted += 1
+            if len(self._pending) >= self.max_pending:
+                self._wake.set()
+
+    def overlay(self, start_date: str, end_date: str) -> tuple[list, set[str]]:
+        """The queued (not yet committed) inserts between dates and the ids of the queued deletes."""
+        with self._lock:
+            operations = self._in_flight + self._pending
+        inserts = [e for op, e in operations if op == INSERT and start_date <= str(e.date) <= end_date]
+        deletes = {entry_id for op, entry_id in operations if op == DELETE}
+        return inserts, deletes
+
+    def flush(self, timeout: float = None) -> bool:
+        """Block until everything queued so far is committed. Returns False on timeout.
+        Raises the error of a batch that failed meanwhile (it's kept queued and retried)."""
+        with self._lock:
+            target, failures = self._submitted, self._failures
+            self._wake.set()
+            done = self._lock.wait_for(lambda: self._written >= target or self._failures != failures
+                                       or not self._thread.is_alive(), timeout)
+            if self._written < target and self._failures != failures:
+                raise self._error
+            return done
+
+    def close(self) -> None:
+        """Flush and stop the writer thread (raises if the queued operations can't be written - see flush)."""
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._stopped = True
+            self._wake.set()
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with self._lock:
+                if self._stopped and (not self._pending or self._error is not None):
+                    if self._pending:
+                        logger.error(f'WriteBehindQueue: closed with {len(self._pending)} operations unwritten')
+                    return
+                self._in_flight, self._pending = self._pending, []
+            error = None
+            if self._in_flight:
+                try:
+                    self._write(self._in_flight)
+                except sqlite3.Error as e:
+                    logger.exception(f'WriteBehindQueue: a batch of {len(self._in_flight)} failed (kept for a retry)')
+                    error = e
+            with self._lock:
+                if error is None:
+                    self._written += len(self._in_flight)
+                    self._error = None
+                else:  # (back to the front of the queue - in order)
+                    self._pending = self._in_flight + self._pending
+                    self._failures, self._error = self._failures + 1, error
+                self._in_flight = []
+                self._lock.notify_all()
+
+    def _write(self, batch: list[tuple[str, object]]) -> None:
+        """Write a batch in a single transaction (retried up to MAX_RETRIES times while the DB is busy/locked).
+        Raises the error if it still fails (nothing of the batch is written)."""
+        from calorie_count.src.DB.meal_entry_db import MealEntryDB
+
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                with MealEntryDB() as db:
+                    for op, arg in batch:
+                        db._insert(arg) if op == INSERT else db._delete(arg)
+                    db.conn.commit()
+                return
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e) or attempt == MAX_RETRIES:
+                    raise
+                logger.warning(f'WriteBehindQueue: retrying a batch of {len(batch)} ({e})')
+                self._wake.wait(self.interval)
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    """Helper function - whether the error is a transient 'database is locked/busy'"""
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+_queue: Optional[WriteBehindQueue] = None
+
+
+def enable(interval: float = 0.3, max_pending: int = 50) -> WriteBehindQueue:
+    """Start queueing the meal-entry writes (see WriteBehindQueue)."""
+    global _queue
+    if _queue is None:
+        _queue = WriteBehindQueue(interval, max_pending)
+    return _queue
+
+
+def disable() -> None:
+    """Flush and stop queueing - MealEntryDB writes synchronously again."""
+    global _queue
+    queue, _queue = _queue, None
+    if queue is not None:
+        queue.close()
+
+
+def get_queue() -> Optional[WriteBehindQueue]:
+    return _queue
+
+
+def flush(timeout: float = None) -> bool:
+    """Flush the queue (if enabled)."""
+    return _queue.flush(timeout) if _queue is not None else True
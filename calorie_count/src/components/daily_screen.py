@@ -1,62 +1,96 @@
 import re
+import threading
 from datetime import date
 from datetime import datetime as dt
 from datetime import timedelta
 
 from kivy.clock import Clock
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivy.uix.scrollview import ScrollView
 from kivymd.toast import toast
-from kivymd.uix.list import IconRightWidget, MDList, TwoLineAvatarIconListItem
+from kivymd.uix.list import IconRightWidget, TwoLineAvatarIconListItem
 
 from calorie_count.src.consts import ARIAL
+from calorie_count.src.DB import changes
 from calorie_count.src.DB.meal_entry_db import MealEntry, MealEntryDB
+from calorie_count.src.utils.profiling import timed
 
 
-class ListEntry(TwoLineAvatarIconListItem):
-    """TwoLineAvatarIconListItem with delete Icon"""
+class ListEntry(RecycleDataViewBehavior, TwoLineAvatarIconListItem):
+    """TwoLineAvatarIconListItem with delete Icon (a recycled view of the Daily screen's list)"""
 
-    def __init__(self, entry_list: MDList, entry: MealEntry, **kwargs):
-        self.entry_list = entry_list
-        self.entry_id = entry.id
+    def __init__(self, **kwargs):
+        self.entry_id = None
+        self.daily_screen = None
         self.delete_icon = IconRightWidget(
             icon="delete", on_release=self.on_del_icon_pressed
         )
         self.is_icon_hidden = True
-        super().__init__(
-            **kwargs,
-            on_press=lambda *a, **k: self.on_item_press(self.entry_id, *a, **k),
-        )
-
-    def on_item_press(self, entry_id: str, _item: TwoLineAvatarIconListItem, *a, **k):
-        """Callback for when list item pressed (Note: mutable default on purpose)"""
+        self._revert_event = None
+        super().__init__(**kwargs, on_press=self.on_item_press)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Called when the view is (re)used for displaying an entry."""
+        self._revert()
+        return super().refresh_view_attrs(rv, index, data)
+
+    def _revert(self, *_a, **_k):
+        """Callback for returning back to normal (hiding the delete icon)."""
+        if self._revert_event:
+            self._revert_event.cancel()
+            self._revert_event = None
         if not self.is_icon_hidden:
-            return
-
-        def _revert(*_a, **_k):
-            """Callback for returning back to normal."""
             self.delete_icon.parent.remove_widget(self.delete_icon)
             self.is_icon_hidden = True
 
+    def on_item_press(self, _item: TwoLineAvatarIconListItem, *a, **k):
+        """Callback for when list item pressed"""
+        if not self.is_icon_hidden:
+            return
         self.add_widget(self.delete_icon)
         self.is_icon_hidden = False
-        Clock.schedule_once(_revert, 5)
+        self._revert_event = Clock.schedule_once(self._revert, 5)
 
     def on_del_icon_pressed(self, icon: IconRightWidget, *_a, **_k):
         """Callback for when delete icon on list item pressed."""
-        self.entry_list.remove_widget(self)
-        with MealEntryDB() as db:
-            db.delete_entry(self.entry_id)
-        toast(f"{self.text} Removed")
+        text = self.text
+        self.daily_screen.remove_entry(self.entry_id)
+        toast(f"{text} Removed")
 
 
 class DailyScreen(ScrollView):
 
-    def update(self, day: date = dt.now().date()):
-        """Given the App (as reference), clears and re-loads the Daily screen.
-        Loads the Entries based on the date given. Default date is today"""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.day: date = None  # The day displayed
+        self._versions = None  # The versions of the DB tables when the day was displayed
+        self._prefetched: dict[date, list[MealEntry]] = {}  # Entries of adjacent days loaded in the background
+        self._prefetching: set[date] = set()
+        self._generation = 0  # prefetches started before the entries changed are dropped
+        changes.subscribe(changes.MEAL_ENTRIES, self._on_entries_changed)
+
+    def _on_entries_changed(self, _table: str, _version: int, details: dict):
+        """Drop the prefetched entries of the days changed (all of them if the days aren't listed - e.g. an import)."""
+        self._generation += 1
+        dates = details.get("dates")
+        if dates is None:
+            self._prefetched.clear()
+            return
+        for day in dates:
+            self._prefetched.pop(dt.fromisoformat(str(day)).date(), None)
+
+    @timed
+    def update(self, day: date = None):
+        """Loads the Daily screen with the Entries of the date given. Default date is today.
+        Nothing is re-loaded if the day is displayed and the DB did not change since,
+        otherwise only the difference from the displayed entries is applied to the list."""
+        today, one_day = dt.now().date(), timedelta(days=1)
+        day = day or today
+        versions = changes.versions(changes.MEAL_ENTRIES)  # (entries keep a snapshot of their Food)
+        if day == self.day and versions == self._versions:
+            return
 
         # -- Set label
-        today, one_day = dt.now().date(), timedelta(days=1)
         day_lbl = (
             "Today"
             if day == today
@@ -64,30 +98,89 @@ class DailyScreen(ScrollView):
         )
         self.ids.total_cals_header_label.text = f"Total Calories {day_lbl}"
 
-        # -- Set Sum
+        # -- Get Entries
+        entries = self._prefetched.pop(day, None)
+        if entries is None:
+            entries = self._load_entries(day)
+
+        # -- Update List of Entries
+        self._apply_entries(entries, same_day=day == self.day)
+        self.day, self._versions = day, versions
+        self._update_sum()
+
+        # -- Prefetch adjacent days
+        for adjacent in (day - one_day, day + one_day):
+            if adjacent <= today:
+                self._prefetch(adjacent)
+
+    @staticmethod
+    def _load_entries(day: date) -> list[MealEntry]:
         with MealEntryDB() as me_db:
-            entries = me_db.get_entries_between_dates(day.isoformat(), day.isoformat())
+            return me_db.get_entries_between_dates(day.isoformat(), day.isoformat())
 
-        cals = sum(e.food.cals for e in entries)
+    def _prefetch(self, day: date):
+        """Load the entries of a day in a background thread."""
+        if day in self._prefetched or day in self._prefetching:
+            return
+        self._prefetching.add(day)
+
+        def _load(generation=self._generation):
+            try:
+                entries = self._load_entries(day)
+                if generation == self._generation:
+                    self._prefetched[day] = entries
+            finally:
+                self._prefetching.discard(day)
+
+        threading.Thread(target=_load, daemon=True).start()
+
+    @staticmethod
+    def _entry_data(i: int, entry: MealEntry) -> dict:
+        """The data of an entry for the list's RecycleView"""
+        return {
+            "entry_id": entry.id,
+            "text": entry.name or f"Meal {i} (Unnamed)",
+            "font_name": str(ARIAL),
+            "secondary_text": f"Calories: {entry.cals: .2f}",
+            "cals": entry.cals,
+        }
+
+    def _apply_entries(self, entries: list[MealEntry], same_day: bool):
+        """Update the list with the entries, removing and adding only the difference if the day is the same."""
+        data = self.ids.daily_entries_list.data
+        new_data = [self._entry_data(i, entry) for i, entry in enumerate(entries, 1)]
+        for item in new_data:
+            item["daily_screen"] = self
+        if not same_day:
+            self.ids.daily_entries_list.data = new_data
+            return
+        new_ids = {item["entry_id"] for item in new_data}
+        for i in reversed(range(len(data))):
+            if data[i]["entry_id"] not in new_ids:
+                del data[i]
+        old_ids = {item["entry_id"] for item in data}
+        data.extend(item for item in new_data if item["entry_id"] not in old_ids)
+
+    def _update_sum(self):
+        cals = sum(item["cals"] for item in self.ids.daily_entries_list.data)
         self.ids.total_cals_label.text = f"{cals: .2f}"
 
-        # -- Create List of Entries
-        entry_list: MDList = self.ids.daily_entries_list
-        entry_list.clear_widgets()
-        for i, entry in enumerate(entries, 1):
-            text = entry.food.name or f"Meal {i} (Unnamed)"
-            entry_list.add_widget(
-                ListEntry(
-                    entry_list,
-                    entry,
-                    text=text,
-                    font_name=str(ARIAL),
-                    secondary_text=f"Calories: {entry.food.cals: .2f}",
-                )
-            )
+    def remove_entry(self, entry_id: str):
+        """Delete an entry from the DB and from the list."""
+        with MealEntryDB() as db:
+            db.delete_entry(entry_id)
+        self._versions = changes.versions(changes.MEAL_ENTRIES)  # The list is updated below
+        data = self.ids.daily_entries_list.data
+        for i, item in enumerate(data):
+            if item["entry_id"] == entry_id:
+                del data[i]
+                break
+        self._update_sum()
 
     def get_day(self) -> date:
         """Get a date object parsed from the label displayed in Daily screen"""
+        if self.day:
+            return self.day
         text = self.ids.total_cals_header_label.text
         if "today" in text.lower():
             return dt.now().date()
@@ -90,7 +90,6 @@ class FoodAddDialog(MDDialog):
         ):
             inner_content.add_widget(x)
         self.content.add_widget(inner_content)
-        self.bind(on_dismiss=app.on_my_foods_screen_pressed)
         # building the dialog
         super().__init__(
             title="Add A new Food",
@@ -3,8 +3,15 @@
 
 from __future__ import annotations
 
+import queue
+import sqlite3
+import threading
+import time
+from itertools import chain
+
 from kivy.clock import Clock
 from kivy.lang import Builder
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
 from kivy.uix.screenmanager import Screen
 from kivymd.uix.button import MDFloatingActionButton
 from kivymd.uix.list import IconLeftWidget, ThreeLineAvatarListItem
@@ -13,6 +20,7 @@ from calorie_count.src.components.food_add_dialog import FoodAddDialog
 from calorie_count.src.consts import ARIAL
 from calorie_count.src.DB.external.client import ExternalFoodsDB, FoodData
 from calorie_count.src.utils.kivy_components import RTLMDTextField
+from calorie_count.src.utils.profiling import timed
 
 KV = """
 <FoodSearchScreen>:
@@ -31,20 +39,56 @@ KV = """
             id: search_bar_layout
             size_hint: 1, .1
             padding: dp(30)
-        ScrollView:
-            MDList:
-                id: result_list
+        RecycleView:
+            id: result_list
+            viewclass: 'SearchResultItem'
+            on_scroll_y: root.on_scroll(self.scroll_y)
+            RecycleBoxLayout:
+                default_size: None, dp(88)
+                default_size_hint: 1, None
+                size_hint_y: None
+                height: self.minimum_height
+                orientation: 'vertical'
 
 """
 Builder.load_string(KV)
 
 
+class SearchResultItem(RecycleDataViewBehavior, ThreeLineAvatarListItem):
+    """A (recycled) search result in FoodSearchScreen"""
+
+    def __init__(self, **kwargs):
+        self.food: FoodData = None
+        self.search_screen: FoodSearchScreen = None
+        self.icon_widget = IconLeftWidget(icon="food")
+        super().__init__(**kwargs)
+        self.add_widget(self.icon_widget)
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.icon_widget.icon = data["icon"]
+        return super().refresh_view_attrs(rv, index, data)
+
+    def on_press(self):
+        self.search_screen.add_food(self.food)
+
+
 class FoodSearchScreen(Screen):
-    """A dialog/pop-up asking the user to search for a new Food."""
+    """A dialog/pop-up asking the user to search for a new Food.
+    The results are pulled by a worker thread (the fuzzy search scans the whole table) a page ahead,
+    requested a page at a time (more when scrolled to the bottom),
+    and are added to the list in chunks across frames, within a time budget per frame."""
+
+    page_size = 15  # results per page
+    frame_budget = 1 / 120  # (s) max time spent adding results per frame
+    load_more_at = 0.1  # (scroll_y) how close to the bottom the next page is loaded
 
     def __init__(self, app, **kwargs):
         super().__init__(**kwargs)
         self.app = app
+        self._results: queue.Queue = None  # the results of the current search pulled so far (None - the end)
+        self._cancelled: threading.Event = None  # stops the worker of the current search
+        self._to_add = 0  # results left to add for the requested pages
+        self._feed_event = None
         self.search_input_field = RTLMDTextField(
             hint_text="Enter name of the food to Search",
             pos_hint={"center_y": 0.9},
@@ -65,43 +109,112 @@ class FoodSearchScreen(Screen):
         self.ids.search_bar_layout.add_widget(self.search_input_field)
         self.ids.search_bar_layout.add_widget(search_button)
 
-    def run_search(self, *args):
-        """Search for the desired food"""
+    @staticmethod
+    def _icon_from_food(f: FoodData) -> str:
+        """Helper function for finding the correct icon"""
+        p, f, c = f.protein, f.fats, f.carbs
+        if p > f and p > c:
+            return "food-steak"
+        if f > p and f > c:
+            return "fish"
+        if c > p and c > f:
+            return "noodles"
+        return "food"
 
-        def _icon_from_food(f: FoodData) -> str:
-            """Helper function for finding the correct icon"""
-            p, f, c = f.protein, f.fats, f.carbs
-            if p > f and p > c:
-                return "food-steak"
-            if f > p and f > c:
-                return "fish"
-            if c > p and c > f:
-                return "noodles"
-            return "food"
+    def _result_data(self, food: FoodData) -> dict:
+        """The data of a search result for the list's RecycleView"""
+        title, *desc = food.description.split(",")
+        if desc:
+            title = f"{desc.pop(0)} - {title}"
+        tertiary = (
+            f"Protein: {food.protein}, "
+            f"Fat: {food.fats}, "
+            f"Carbs: {food.carbs}\n"
+            f" Sodium: {food.sodium},"
+            f" Sugar: {food.sugar}, "
+            f"Water: {food.water}"
+        )
+        return {
+            "text": title,
+            "secondary_text": ",".join(desc),
+            "tertiary_text": tertiary,
+            "icon": self._icon_from_food(food),
+            "food": food,
+            "search_screen": self,
+        }
 
+    @timed
+    def run_search(self, *args):
+        """Search for the desired food"""
         to_search = self.search_input_field.text
         if not to_search:
             return
-        self.ids.result_list.clear_widgets()
-        with ExternalFoodsDB() as ef_db:
-            for food in ef_db.get_similar_food_by_name(to_search):
-                title, *desc = food.description.split(",")
-                if desc:
-                    title = f"{desc.pop(0)} - {title}"
-                tertiary = (
-                    f"Protein: {food.protein}, "
-                    f"Fat: {food.fats}, "
-                    f"Carbs: {food.carbs}\n"
-                    f" Sodium: {food.sodium},"
-                    f" Sugar: {food.sugar}, "
-                    f"Water: {food.water}"
-                )
-                list_item = ThreeLineAvatarListItem(
-                    text=title, secondary_text=",".join(desc), tertiary_text=tertiary
-                )
-                list_item.add_widget(IconLeftWidget(icon=_icon_from_food(food)))
-                list_item.bind(on_press=lambda *a, f=food, **k: self.add_food(f))
-                self.ids.result_list.add_widget(list_item)
+        self._close_search()
+        self.ids.result_list.data = []
+        self._results, self._cancelled = queue.Queue(maxsize=self.page_size), threading.Event()
+        threading.Thread(target=self._pull_results, args=(to_search, self._results, self._cancelled),
+                         name='food-search', daemon=True).start()
+        self.load_more()
+
+    @staticmethod
+    def _pull_results(name: str, results: queue.Queue, cancelled: threading.Event):
+        """Runs on a worker thread - puts the results of the search in 'results' (blocks while it's full)
+        and then None, until cancelled."""
+        with ExternalFoodsDB() as db:
+            db.conn.set_progress_handler(cancelled.is_set, 1000)  # (aborts the fuzzy scan once cancelled)
+            try:
+                for food in chain(db.get_similar_food_by_name(name, max_results=None), [None]):
+                    while not cancelled.is_set():
+                        try:
+                            results.put(food, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if cancelled.is_set():
+                        return
+            except sqlite3.OperationalError:  # (interrupted)
+                if not cancelled.is_set():
+                    raise
+
+    def load_more(self, *args):
+        """Request the next page of results (they are added over the next frames)."""
+        if self._results is None:
+            return
+        self._to_add = self.page_size
+        if not self._feed_event:
+            self._feed_event = Clock.schedule_interval(self._feed, 0)
+
+    def on_scroll(self, scroll_y: float):
+        if scroll_y <= self.load_more_at and not self._to_add:
+            self.load_more()
+
+    @timed
+    def _feed(self, *args):
+        """Called every frame - adds results to the list until the frame's time budget runs out."""
+        start, chunk = time.perf_counter(), []
+        while self._to_add and time.perf_counter() - start < self.frame_budget:
+            try:
+                food = self._results.get_nowait()
+            except queue.Empty:  # (not pulled yet - try again next frame)
+                break
+            if food is None:
+                self._close_search()
+                break
+            chunk.append(self._result_data(food))
+            self._to_add -= 1
+        self.ids.result_list.data.extend(chunk)
+        if not self._to_add:
+            self._feed_event = None
+            return False
+
+    def _close_search(self):
+        """Stop pulling results from the current search."""
+        if self._feed_event:
+            self._feed_event.cancel()
+            self._feed_event = None
+        if self._cancelled:
+            self._cancelled.set()
+        self._results, self._cancelled, self._to_add = None, None, 0
 
     def add_food(self, food: FoodData):
         dialog = FoodAddDialog(self.app)
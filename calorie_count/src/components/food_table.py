@@ -0,0 +1,166 @@
+"""This Module holds a class FoodTable
+    - The table of 'My Foods', a RecycleView fetching pages of Foods from FoodDB on demand."""
+
+from __future__ import annotations
+
+from kivy.clock import Clock
+from kivy.lang import Builder
+from kivy.metrics import dp
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.widget import Widget
+from kivymd.uix.boxlayout import MDBoxLayout
+from kivymd.uix.button import MDFlatButton
+from kivymd.uix.label import MDLabel
+
+from calorie_count.src.consts import ARIAL
+from calorie_count.src.DB import changes
+from calorie_count.src.DB.food_db import Food, FoodDB
+from calorie_count.src.utils.profiling import timed
+
+KV = """
+<FoodTableRow>:
+    size_hint_y: None
+    height: dp(40)
+    MDCheckbox:
+        id: check
+        size_hint_x: None
+        width: dp(30)
+        on_release: root.on_check_pressed(self.active)
+
+<FoodTable>:
+    orientation: 'vertical'
+    MDTextField:
+        id: filter_input
+        size_hint_y: None
+        height: dp(40)
+        on_text: root.on_filter_text(self.text)
+    MDBoxLayout:
+        id: header
+        size_hint_y: None
+        height: dp(40)
+    RecycleView:
+        id: rv
+        viewclass: 'FoodTableRow'
+        on_scroll_y: root.on_scroll(self.scroll_y)
+        RecycleBoxLayout:
+            default_size: None, dp(40)
+            default_size_hint: 1, None
+            size_hint_y: None
+            height: self.minimum_height
+            orientation: 'vertical'
+"""
+Builder.load_string(KV)
+
+
+class FoodTableRow(RecycleDataViewBehavior, MDBoxLayout):
+    """A (recycled) row of FoodTable. Holds no state, the check-selection is kept in FoodTable.checked"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.table: FoodTable = None
+        self.name = ''
+        self.labels = [MDLabel(font_name=str(ARIAL), font_style='Caption') for _ in Food.columns()]
+        for label in self.labels:
+            self.add_widget(label)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Called when the row is (re)used for displaying a Food."""
+        self.table, self.name = data['table'], data['name']
+        self.ids.check.active = self.name in self.table.checked
+        for label, text in zip(self.labels, data['values']):
+            label.text = text
+        return super().refresh_view_attrs(rv, index, data)
+
+    def on_check_pressed(self, active: bool):
+        if active:
+            self.table.checked.add(self.name)
+        else:
+            self.table.checked.discard(self.name)
+
+
+class FoodTable(MDBoxLayout):
+    """A table of the Foods in FoodDB.
+    Only the visible rows are widgets, pages are fetched from the DB (sorted and filtered in SQL) when scrolled to.
+    The table re-loads only when the Foods changed (while displayed, or when refreshed)."""
+
+    page_size = 50
+    load_more_at = 0.1  # (scroll_y) how close to the bottom the next page is loaded
+
+    def __init__(self, **kwargs):
+        self.sort_column = Food.columns()[0]
+        self.descending = False
+        self.filter_text = ''
+        self.checked: set[str] = set()  # names of checked Foods
+        self._after = None  # key of the next page
+        self._exhausted = False
+        self._version = None  # version of the Foods loaded
+        self._filter_trigger = Clock.create_trigger(self.reload, 0.3)
+        self._refresh_trigger = Clock.create_trigger(self.refresh)
+        changes.subscribe(changes.FOOD, self._on_foods_changed)
+        super().__init__(**kwargs)
+        self.header_buttons = {}
+        self.ids.header.add_widget(Widget(size_hint_x=None, width=dp(30)))
+        for col in Food.columns():
+            button = MDFlatButton(text=col, font_style='Caption',
+                                  on_release=lambda *a, c=col: self.on_header_pressed(c))
+            self.header_buttons[col] = button
+            self.ids.header.add_widget(button)
+        self._update_header()
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.ids.rv.data
+
+    def refresh(self, *args):
+        """Re-load the table only if the Foods changed since loaded."""
+        if self._version != changes.version(changes.FOOD):
+            self.reload()
+
+    def _on_foods_changed(self, *args):
+        if self.get_root_window() is not None:  # displayed
+            self._refresh_trigger()
+
+    def reload(self, *args):
+        """Reset the paging and load the first page."""
+        self._version = changes.version(changes.FOOD)
+        self._after, self._exhausted = None, False
+        self.ids.rv.data = []
+        self.ids.rv.scroll_y = 1
+        self.load_next_page()
+
+    @timed
+    def load_next_page(self, *args):
+        """Fetch the next page of Foods from the DB and append it to the table."""
+        if self._exhausted:
+            return
+        with FoodDB() as fdb:
+            foods, self._after = fdb.get_foods_page(self._after, order_by=self.sort_column,
+                                                    descending=self.descending, filter_text=self.filter_text,
+                                                    limit=self.page_size)
+        self._exhausted = len(foods) < self.page_size
+        self.ids.rv.data.extend({'table': self,
+                                 'name': food.name,
+                                 'values': [v if isinstance(v, str) else f'{v:.1f}' for v in food.values]}
+                                for food in foods)
+
+    def on_scroll(self, scroll_y: float):
+        if scroll_y <= self.load_more_at:
+            self.load_next_page()
+
+    def on_header_pressed(self, column: str):
+        """Sort by the column pressed (pressing the sorted column again reverses the order)."""
+        self.descending = not self.descending if column == self.sort_column else False
+        self.sort_column = column
+        self._update_header()
+        self.reload()
+
+    def on_filter_text(self, text: str):
+        self.filter_text = text
+        self._filter_trigger()  # reloading once the user stops typing
+
+    def _update_header(self):
+        """Show the sorted column and its direction in the header (the filter is on the sorted column)."""
+        self.ids.filter_input.hint_text = f"Filter {self.sort_column} (e.g. apple, >100)"
+        for col, button in self.header_buttons.items():
+            arrow = (' v' if self.descending else ' ^') if col == self.sort_column else ''
+            button.text = col + arrow
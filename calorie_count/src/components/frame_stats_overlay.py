@@ -0,0 +1,58 @@
+"""This Module holds a class FrameStatsOverlay
+    - An optional debug overlay showing the frame-budget stats of the UI handlers (see utils/profiling.py)."""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime as dt
+
+from kivy.app import App
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivymd.toast import toast
+from kivymd.uix.button import MDFlatButton
+from kivymd.uix.card import MDCard
+from kivymd.uix.label import MDLabel
+
+from calorie_count.src.utils.profiling import profiler
+
+
+class FrameStatsOverlay(MDCard):
+    """A card floating over the app with the slowest handlers and the dropped frames.
+    Opening the overlay enables the profiler, closing it disables it."""
+
+    refresh_interval = 0.5  # (s)
+
+    def __init__(self, **kwargs):
+        super().__init__(orientation="vertical", size_hint=(1, 0.3), pos_hint={"top": 1},
+                         md_bg_color=(0, 0, 0, 0.7), padding=10, **kwargs)
+        self.label = MDLabel(font_style="Caption", theme_text_color="Custom", text_color=(0, 1, 0, 1))
+        self.add_widget(self.label)
+        self.add_widget(MDFlatButton(text="Export Trace", on_release=self.export_trace))
+        self._refresh_event = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.parent is not None
+
+    def open(self):
+        profiler.enable()
+        Window.add_widget(self)
+        self._refresh_event = Clock.schedule_interval(self.refresh, self.refresh_interval)
+
+    def close(self):
+        profiler.disable()
+        Window.remove_widget(self)
+        if self._refresh_event:
+            self._refresh_event.cancel()
+            self._refresh_event = None
+
+    def toggle(self):
+        self.close() if self.is_open else self.open()
+
+    def refresh(self, *args):
+        self.label.text = profiler.summary()
+
+    def export_trace(self, *args):
+        path = os.path.join(App.get_running_app().user_data_dir, f"frame_trace_{dt.now():%F_%H-%M-%S}.json")
+        toast(f"Saved: {profiler.export_trace(path)}")
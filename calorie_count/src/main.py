@@ -5,9 +5,13 @@
 from __future__ import annotations
 
 import os
+import sqlite3
+import time
 from datetime import datetime as dt
 from datetime import timedelta
 
+_START_TIME = time.perf_counter()  # for measuring the time to first frame
+
 # from calorie_count.src.consts import ARIAL
 
 try:
@@ -16,26 +20,30 @@ except (Exception,):
     os.environ["KIVY_GL_BACKEND"] = "angle_sdl2"  # (debug w/ Windows + GPU)
 from kivy.clock import Clock
 from kivy.lang import Builder
+from kivy.logger import Logger
 from kivy.metrics import dp
 from kivymd.app import MDApp
 from kivymd.toast import toast
 from kivymd.uix.button import MDFillRoundFlatIconButton, MDFlatButton
-from kivymd.uix.datatables import MDDataTable
 from kivymd.uix.dialog import MDDialog
-from kivymd.uix.filemanager import MDFileManager
+from kivymd.uix.label import MDLabel
 from kivymd.uix.menu import MDDropdownMenu
 from kivymd.uix.pickers import MDDatePicker
 
-from calorie_count.lib.theme.picker import MDThemePicker
 from calorie_count.src.components.daily_screen import DailyScreen
 from calorie_count.src.components.food_add_dialog import FoodAddDialog
-from calorie_count.src.components.food_search import FoodSearchScreen
-from calorie_count.src.DB.food_db import Food, FoodDB
+from calorie_count.src.DB import backup, changes, maintenance, profiles, tracing, write_behind
+from calorie_count.src.DB.food_db import FoodDB
 from calorie_count.src.DB.meal_entry_db import MealEntry, MealEntryDB
-from calorie_count.src.utils import config, consts, xlsx
-from calorie_count.src.utils.plotting import plot_graph, plot_pie_chart
+from calorie_count.src.DB.stats import daily_stats
+from calorie_count.src.utils import config, consts, jobs
+from calorie_count.src.utils.profiling import timed
 from calorie_count.src.utils.utils import sort_by_similarity
 
+# Note: heavy modules (matplotlib via plotting, openpyxl via xlsx, the theme picker,
+# file manager, Foods table and the Food Search screen) are imported on first use
+# to keep the cold start fast.
+
 
 class CaloriesApp(MDApp):
     def __init__(self, **kwargs):
@@ -43,6 +51,11 @@ class CaloriesApp(MDApp):
         self.add_food_dialog = None
         self.food_table = None
         self._drop_down = None
+        self._food_search_screen = None
+        self._trend_generated_for = None  # (DB versions, start date, end date) of the current trend
+        self._frame_stats_overlay = None
+        self._maintenance = maintenance.MaintenanceScheduler()
+        self._last_input = time.monotonic()  # (for running the DB maintenance when idle)
 
     def build(self):
         # Configuring picker data
@@ -53,24 +66,75 @@ class CaloriesApp(MDApp):
             self.theme_cls.primary_palette,
         ) = config.get_theme()
 
+        profiles.set_profile(config.get_db_profile())
+        slow_query_threshold = config.get_slow_query_threshold()
+        if slow_query_threshold is not None:
+            tracing.set_tracer(tracing.SlowQueryLog(slow_query_threshold))
+        write_behind_params = config.get_write_behind()
+        if write_behind_params is not None:
+            write_behind.enable(*write_behind_params)
+
         Clock.schedule_once(self._post_build_)
+        Clock.schedule_interval(self._on_idle_check, consts.MAINTENANCE_IDLE_AFTER)
 
         from kivy.core.window import Window
 
         Window.size = (500, 700)
+        Window.bind(on_touch_down=self._on_user_input, on_key_down=self._on_user_input)
         return Builder.load_file(consts.MAIN_KV)
 
+    def on_pause(self):
+        self._flush_entries()  # (the App might be killed while paused)
+        self._maintenance.run_in_background(consts.MAINTENANCE_PAUSE_SLICE, long=True)
+        return True
+
+    def _on_user_input(self, *args):
+        self._last_input = time.monotonic()
+        return False  # (not consumed)
+
+    def _on_idle_check(self, *args):
+        """Run a DB maintenance slice (in the background) if there was no user input for a while."""
+        if time.monotonic() - self._last_input >= consts.MAINTENANCE_IDLE_AFTER:
+            self._maintenance.run_in_background(consts.MAINTENANCE_SLICE)
+
+    def on_stop(self):
+        self._flush_entries(close=True)
+
+    @staticmethod
+    def _flush_entries(close: bool = False):
+        """Commit the queued meal-entries (close => and stop queueing).
+        If they can't be written the user is told - they stay queued (see write_behind.py)."""
+        try:
+            write_behind.disable() if close else write_behind.flush()
+        except sqlite3.Error as e:
+            Logger.exception("CaloriesApp: the queued meal-entries could not be written")
+            toast(f"Could not save your entries: {e}")
+
     def _post_build_(self, *a, **k):
-        self.on_my_foods_screen_pressed()  # loading table
+        """Called on the first frame.
+        (The My Foods table and Food Search screen are built when first navigated to)"""
+        first_frame = time.perf_counter() - _START_TIME
+        log = Logger.warning if first_frame > consts.FIRST_FRAME_TARGET else Logger.info
+        log(f"CaloriesApp: Time to first frame: {first_frame:.3f}s "
+            f"(target: {consts.FIRST_FRAME_TARGET}s)")
+
         self._switch_tab()  # setting default tab
-        self.food_search_screen = FoodSearchScreen(self)
-        self.root.ids.screen_manager.add_widget(self.food_search_screen)
 
         # setting entry date to today
         self.root.ids.entry_add_screen.ids.date_input.text = (
             f"Date:\n{dt.now().date().isoformat()}"
         )
 
+    @property
+    def food_search_screen(self):
+        """The Food Search screen (built and added to the screen manager on first use)."""
+        if self._food_search_screen is None:
+            from calorie_count.src.components.food_search import FoodSearchScreen
+
+            self._food_search_screen = FoodSearchScreen(self)
+            self.root.ids.screen_manager.add_widget(self._food_search_screen)
+        return self._food_search_screen
+
     def _switch_tab(self, name: str = "add_entry"):
         """Helper for switching the current tab."""
         self.root.ids.bottom_navigation.switch_tab(name)
@@ -86,25 +150,18 @@ class CaloriesApp(MDApp):
         daily_screen: DailyScreen = self.root.ids.daily_screen
         daily_screen.update()
 
+    @timed
     def on_my_foods_screen_pressed(self, *args):
-        with FoodDB() as fdb:
-            foods = fdb.get_all_foods()
-
-        table_layout = self.root.ids.foods_screen.ids.my_foods_layout
-        table_layout.clear_widgets()
-        self.food_table = MDDataTable(
-            column_data=[(col, dp(30)) for col in Food.columns()],
-            row_data=[m.values for m in foods],
-            # font_name=str(ARIAL),
-            check=True,
-            use_pagination=True,
-        )
-        if not foods:
-            self.food_table.title = "No Foods Yet"
+        """Init My Foods screen (the table is built once, then only re-loaded if the Foods changed)"""
+        if self.food_table is None:
+            from calorie_count.src.components.food_table import FoodTable
+
+            self.food_table = FoodTable()
+            self.root.ids.foods_screen.ids.my_foods_layout.add_widget(self.food_table)
+        self.food_table.refresh()
+        if self.food_table.is_empty and not self.food_table.filter_text:
             toast("No Foods Yet")
 
-        table_layout.add_widget(self.food_table)
-
     def on_add_food_pressed(self, *args):
         if not self.add_food_dialog:
             self.add_food_dialog = FoodAddDialog(self)
@@ -123,7 +180,8 @@ class CaloriesApp(MDApp):
             start.text += f"\n{a_week_ago}"
             end.text += f"\n{today}"
             _once.append(1)
-        self.generate_trend()
+        if self._trend_generated_for != self._get_trend_key():
+            self.generate_trend()  # Only if the dates or the DB changed
 
     def _dismiss_drop_down(self, *args):
         """Safely dismiss dropdown"""
@@ -131,6 +189,7 @@ class CaloriesApp(MDApp):
             self._drop_down.dismiss()
             self._drop_down = None
 
+    @timed
     def on_name_entered_in_add_entry_screen(self, c: str, *args):
         """c is the additional character entered by the user"""
 
@@ -212,18 +271,17 @@ class CaloriesApp(MDApp):
             dialog.open()
         else:
             with MealEntryDB() as me_db:
-                me = MealEntry(name=name, portion=float(portion or 0), date=entry_date)
-                me_db.add_meal_entry(me)
+                me = me_db.add_meal_entry(MealEntry(name=name, portion=float(portion or 0), date=entry_date))
                 toast(f"Added Meal entry!\n({me}")
 
     def on_delete_foods_pressed(self, *args):
-        names = [x[0] for x in self.food_table.get_row_checks()]
+        names = list(self.food_table.checked)
 
         def remove(*a, **k):
             with FoodDB() as mdb:
                 mdb.remove(names)
+                self.food_table.checked.difference_update(names)
                 dialog.dismiss()
-                self.on_my_foods_screen_pressed()
                 toast(f"Removed {len(names)} Food/s")
 
         dialog = MDDialog(
@@ -278,8 +336,8 @@ class CaloriesApp(MDApp):
             (end_button.text.splitlines()[0], end_date.isoformat())
         )
 
-    def generate_trend(self, *args, **kwargs):
-        # -- Getting The relevant entries
+    def _get_trend_key(self) -> tuple:
+        """The DB versions and dates a trend is generated for."""
         start_date = (
             self.root.ids.trends_screen.ids.trend_start_date_button.text.splitlines()[
                 -1
@@ -288,44 +346,78 @@ class CaloriesApp(MDApp):
         end_date = (
             self.root.ids.trends_screen.ids.trend_end_date_button.text.splitlines()[-1]
         )
+        return changes.versions(changes.MEAL_ENTRIES), start_date, end_date
+
+    @timed
+    def generate_trend(self, *args, **kwargs):
+        from calorie_count.src.utils.plotting import plot_graph, plot_pie_chart
+
+        # -- Getting The relevant entries
+        self._trend_generated_for = _, start_date, end_date = self._get_trend_key()
 
-        with MealEntryDB() as me_db:
-            entries = me_db.get_entries_between_dates(str(start_date), str(end_date))
+        days, daily = daily_stats.daily(start_date, end_date)
+        dates = days.astype(str)
+        rolling = {
+            f"{window}-day avg": daily_stats.rolling_mean(days, window)
+            for window in consts.TREND_ROLLING_WINDOWS
+        }
 
         trends_layout = self.root.ids.trends_screen.ids.trends_layout
         trends_layout.clear_widgets()
-        # -- Adding Graph of calorie sum
-        data = dict.fromkeys((e.date for e in entries), 0)
-        for e in entries:
-            data[e.date] += e.food.cals
-
-        graph = plot_graph(data, y_label="Calories")
-        trends_layout.add_widget(graph)
+        # -- Adding the average compared to the previous period (of the same length)
+        period = dt.fromisoformat(end_date) - dt.fromisoformat(start_date)
+        previous_end = dt.fromisoformat(start_date).date() - timedelta(days=1)
+        mean = daily_stats.mean(start_date, end_date)["calories"]
+        previous_mean = daily_stats.mean(previous_end - period, previous_end)["calories"]
+        trends_layout.add_widget(
+            MDLabel(
+                text=f"Avg: {mean:.0f} Calories/day (previous period: {previous_mean:.0f})",
+                halign="center",
+                size_hint_y=None,
+                height=dp(30),
+            )
+        )
 
-        # -- Adding Graph of sodium
-        data = dict.fromkeys((e.date for e in entries), 0)
-        for e in entries:
-            data[e.date] += e.food.sodium
-        graph = plot_graph(data, y_label="Sodium")
-        trends_layout.add_widget(graph)
+        # -- Adding Graphs of calorie sum and sodium (with their rolling averages)
+        for column, label in (("calories", "Calories"), ("sodium", "Sodium")):
+            graph = plot_graph(
+                dict(zip(dates, daily[column])),
+                y_label=label,
+                lines={
+                    name: dict(zip(dates, means[column]))
+                    for name, means in rolling.items()
+                },
+            )
+            trends_layout.add_widget(graph)
 
         # -- Adding Pie Chart
+        total = daily_stats.total(start_date, end_date)
         data = {
-            "Protein": sum(e.food.proteins for e in entries),
-            "Carbs": sum(e.food.carbs for e in entries),
-            "Fats": sum(e.food.fats for e in entries),
+            "Protein": total["protein"],
+            "Carbs": total["carbs"],
+            "Fats": total["fats"],
         }
         pie_chart = plot_pie_chart(data)
         trends_layout.add_widget(pie_chart)
 
     def on_search_food_pressed(self, *_, query: str = "", **kwargs):
         """Search for a food button pressed."""
+        food_search_screen = self.food_search_screen
         self.root.ids.screen_manager.transition.direction = "left"
         self.root.ids.screen_manager.current = "food_search_screen"
         if query:
-            self.food_search_screen.search_input_field.text = query
+            food_search_screen.search_input_field.text = query
+
+    def toggle_frame_stats_overlay(self, *args):
+        """Show/Hide the debug overlay of the UI handler timings."""
+        if self._frame_stats_overlay is None:
+            from calorie_count.src.components.frame_stats_overlay import FrameStatsOverlay
+
+            self._frame_stats_overlay = FrameStatsOverlay()
+        self._frame_stats_overlay.toggle()
 
     def show_theme_picker(self, *args, **kwargs):
+        from calorie_count.lib.theme.picker import MDThemePicker
 
         def _set_theme(*a, **k):
             config.set_theme(
@@ -339,12 +431,15 @@ class CaloriesApp(MDApp):
         theme_dialog.open()
 
     def open_xlsx_dropdown(self, *args, **kwargs):
+        from kivymd.uix.filemanager import MDFileManager
+
+        from calorie_count.src.utils import xlsx
+
         def save_to_xlsx():  # option 1 - Save
             def _on_selected(fl, *a):  # file selected  => Are you sure Dialog
                 def _save(*a_, **k):  # User chooses to save selected file
-                    xlsx.save_to_excel(target)
-                    toast(f"Saved: {target}")
                     dialog.dismiss()
+                    self._run_job("Saving", xlsx.save_to_excel, target, done=f"Saved: {target}")
 
                 target = f"{fl}/Calorie_Counting_{dt.now():%F}.xlsx"
                 dialog = MDDialog(
@@ -362,11 +457,14 @@ class CaloriesApp(MDApp):
             file_manager = MDFileManager(search="dirs", select_path=_on_selected)
             file_manager.show(os.path.expanduser("~"))
 
-        def import_xlsx():  # option 2 - Save
+        def import_xlsx():  # option 2 - Import (xlsx, or a CSV / JSON-Lines file of a table)
             def _on_selected(fl):  # file selected  => Are you sure Dialog
                 def _load(*a_, **k_):  # User finally chose
-                    print("Loading:", fl)
-                    xlsx.import_excel(fl)
+                    from calorie_count.src.utils import interchange
+
+                    dialog.dismiss()
+                    load = xlsx.import_excel if fl.endswith(".xlsx") else interchange.import_file
+                    self._run_job("Loading", load, fl, done=f"Loaded: {fl}")
 
                 dialog = MDDialog(
                     text=f"Are you sure you want to Load:\n{fl}?",
@@ -385,11 +483,56 @@ class CaloriesApp(MDApp):
             file_manager = MDFileManager(
                 ext=[
                     ".xlsx",
+                    ".csv",
+                    ".jsonl",
+                    ".gz",
                 ],
                 select_path=_on_selected,  # function called when selecting a file/directory
             )
             file_manager.show(os.path.expanduser("~"))
 
+        def export_as(fmt: str, incremental: bool = False):  # option 3 - Save as CSV / JSON-Lines
+            from calorie_count.src.utils import interchange  # (a file per table, gzip compressed)
+
+            def _on_selected(fl, *a):
+                file_manager.close()
+                self._run_job(
+                    "Saving", interchange.export, fl, fmt, done=f"Saved: {fl} ({fmt})", incremental=incremental
+                )
+
+            file_manager = MDFileManager(search="dirs", select_path=_on_selected)
+            file_manager.show(os.path.expanduser("~"))
+
+        def backup_db():  # option 4 - Backup (a compressed snapshot of the DB)
+            def _on_selected(fl, *a):
+                file_manager.close()
+                target = f"{fl}/Calorie_Counting_{dt.now():%F}{backup.SUFFIX}"
+                self._run_job("Backing up", backup.backup, target, done=f"Backed up: {target}")
+
+            file_manager = MDFileManager(search="dirs", select_path=_on_selected)
+            file_manager.show(os.path.expanduser("~"))
+
+        def restore_db():  # option 5 - Restore (replaces all the Foods and entries)
+            def _on_selected(fl):  # file selected  => Are you sure Dialog
+                def _restore(*a_, **k_):
+                    dialog.dismiss()
+                    self._run_job("Restoring", backup.restore, fl, done=f"Restored: {fl}")
+
+                dialog = MDDialog(
+                    text=f"Replace ALL your Foods and entries with:\n{fl}?",
+                    buttons=[
+                        MDFlatButton(
+                            text="CANCEL", on_press=lambda *a_, **k_: dialog.dismiss()
+                        ),
+                        MDFlatButton(text="RESTORE", on_press=_restore),
+                    ],
+                    on_dismiss=lambda *a_: file_manager.close(),
+                )
+                dialog.open()
+
+            file_manager = MDFileManager(ext=[".gz"], select_path=_on_selected)
+            file_manager.show(os.path.expanduser("~"))
+
         self._dismiss_drop_down()
         self._drop_down = MDDropdownMenu(
             items=[
@@ -405,6 +548,36 @@ class CaloriesApp(MDApp):
                     "icon": "attachment",
                     "on_release": import_xlsx,
                 },
+                {
+                    "viewclass": "OneLineIconListItem",
+                    "text": "Save as CSV",
+                    "icon": "file-delimited",
+                    "on_release": lambda: export_as("csv"),
+                },
+                {
+                    "viewclass": "OneLineIconListItem",
+                    "text": "Save as JSON-Lines",
+                    "icon": "code-json",
+                    "on_release": lambda: export_as("jsonl"),
+                },
+                {
+                    "viewclass": "OneLineIconListItem",
+                    "text": "Save new entries (CSV)",
+                    "icon": "file-clock",
+                    "on_release": lambda: export_as("csv", incremental=True),
+                },
+                {
+                    "viewclass": "OneLineIconListItem",
+                    "text": "Backup",
+                    "icon": "database-export",
+                    "on_release": backup_db,
+                },
+                {
+                    "viewclass": "OneLineIconListItem",
+                    "text": "Restore backup",
+                    "icon": "database-import",
+                    "on_release": restore_db,
+                },
             ],
             position="center",
             caller=self.root.ids.top_app_bar,
@@ -412,6 +585,48 @@ class CaloriesApp(MDApp):
         )
         self._drop_down.open()
 
+    @staticmethod
+    def _run_job(title: str, func, *args, done: str, **kwargs) -> jobs.Job:
+        """Run func(*args, progress=..., **kwargs) as a background job (see jobs.py) with a progress dialog
+        (CANCEL cancels it), and toast 'done' (or the error) when it's finished."""
+        from kivymd.uix.boxlayout import MDBoxLayout
+        from kivymd.uix.progressbar import MDProgressBar
+
+        job = jobs.Job(func, *args, **kwargs)
+        content = MDBoxLayout(orientation="vertical", adaptive_height=True, spacing=dp(12))
+        label = MDLabel(text="Starting...", adaptive_height=True)
+        bar = MDProgressBar(max=1, value=0, size_hint_y=None, height=dp(4))
+        content.add_widget(label)
+        content.add_widget(bar)
+        dialog = MDDialog(
+            title=title,
+            type="custom",
+            content_cls=content,
+            auto_dismiss=False,  # (the job keeps running - only CANCEL stops it)
+            buttons=[MDFlatButton(text="CANCEL", on_press=lambda *a: job.cancel())],
+        )
+
+        def _update(*a):  # (polled - the worker thread never touches the UI)
+            if job.total:
+                bar.value = min(job.done / job.total, 1)
+                label.text = f"{job.done:,} / {job.total:,}"
+            elif job.done:
+                label.text = f"{job.done:,}"
+            if not job.finished:
+                return
+            event.cancel()
+            dialog.dismiss()
+            if job.completed:
+                toast(done)
+            elif job.error is not None:
+                toast(f"Failed: {job.error}")
+            else:
+                toast(f"Cancelled: {title}")
+
+        event = Clock.schedule_interval(_update, consts.JOB_PROGRESS_INTERVAL)
+        dialog.open()
+        return job.start()
+
 
 def main():
     CaloriesApp().run()
@@ -1,4 +1,6 @@
 """Implementation details for accessing and updating config.ini file."""
+from __future__ import annotations
+
 import atexit
 import configparser
 import os
@@ -10,6 +12,9 @@ if not CONFIG:
     CONFIG = Path('config.ini')
 THEME_HEADER = 'THEME'
 DB_PATH_HEADER, DB_PATH_SECTION = "DB_PATH", 'path'
+DB_TRACE_HEADER, SLOW_QUERY_SECTION = "DB_TRACE", 'slow_query_ms'
+WRITE_BEHIND_HEADER = "DB_WRITE_BEHIND"
+DB_PROFILE_HEADER, DB_PROFILE_SECTION = "DB_PROFILE", 'name'
 
 
 def set_theme(theme_style: str,
@@ -43,6 +48,32 @@ def get_db_path(config_path: str = CONFIG) -> str:
     return parser.get(DB_PATH_HEADER, DB_PATH_SECTION, fallback="Dark")
 
 
+def get_slow_query_threshold(config_path: str = CONFIG) -> float | None:
+    """Returns the threshold (seconds) of the slow-query log saved in config.ini (None - tracing disabled)"""
+    parser = configparser.ConfigParser()
+    parser.read(config_path)
+    ms = parser.getfloat(DB_TRACE_HEADER, SLOW_QUERY_SECTION, fallback=None)
+    return None if ms is None else ms / 1000
+
+
+def get_write_behind(config_path: str = CONFIG) -> tuple[float, int] | None:
+    """Returns the (interval (seconds), max pending) of the write-behind queue saved in config.ini
+    (None - disabled, meal-entries are written synchronously)"""
+    parser = configparser.ConfigParser()
+    parser.read(config_path)
+    if not parser.has_section(WRITE_BEHIND_HEADER):
+        return None
+    return (parser.getfloat(WRITE_BEHIND_HEADER, 'interval_ms', fallback=300) / 1000,
+            parser.getint(WRITE_BEHIND_HEADER, 'max_pending', fallback=50))
+
+
+def get_db_profile(config_path: str = CONFIG) -> str:
+    """Returns the name of the DB connection profile saved in config.ini (see DB/profiles.py)"""
+    parser = configparser.ConfigParser()
+    parser.read(config_path)
+    return parser.get(DB_PROFILE_HEADER, DB_PROFILE_SECTION, fallback="interactive")
+
+
 def _set_db_path(path: str = 'calorie_app.db', config_path: str = CONFIG):
     parser = configparser.ConfigParser()
     parser[DB_PATH_HEADER] = {DB_PATH_SECTION: path}
@@ -1,3 +1,12 @@
 """Here we store Constants (mostly to avoid 'magic numbers' )"""
 from pathlib import Path
 MAIN_KV = str((Path(__file__).parent.parent / "kv_files" / "main.kv").resolve())
+
+FIRST_FRAME_TARGET = 1.5  # (seconds) time from start-up to the first frame of the app
+FRAME_BUDGET = 1 / 60  # (seconds) max time of a UI handler without dropping a frame (60 fps)
+TREND_ROLLING_WINDOWS = (7, 30)  # (days) rolling averages shown on the Trends screen
+MAINTENANCE_IDLE_AFTER = 30  # (seconds) without user input before a DB maintenance slice runs
+MAINTENANCE_SLICE = 0.2  # (seconds) budget of a DB maintenance slice while idle (on a worker thread)
+MAINTENANCE_PAUSE_SLICE = 1.0  # (seconds) budget of the DB maintenance slice started when the App is paused
+# (the pause slice also runs the tasks that can't resume, e.g. integrity_check - see maintenance.py)
+JOB_PROGRESS_INTERVAL = 0.1  # (seconds) between updates of the progress dialog of a background job
@@ -0,0 +1,237 @@
+""" Here we store the streaming CSV / JSON-Lines export and import (the same columns as the xlsx:
+Food.columns() and MealEntry.columns())
+    - Each table is a file of its own:  <name>.foods.<csv|jsonl>  and  <name>.meal_entries.<csv|jsonl>
+      A '.gz' suffix compresses/decompresses it with gzip.
+    - Rows are streamed from DB cursors in batches (see FoodDB.iter_values, MealEntryDB.iter_values) -
+      no Foods/MealEntries are built, and nothing is held in memory.
+    - Importing detects the table from the file's columns. Foods are updated, entries are added -
+      each file in a single transaction.
+    - Incremental export: only the meal-entries added since the last export to the same target (directory, name
+      and format) are written, to a file of their own. The high-water mark (the sequence of the last entry exported,
+      see MealEntryDB.get_last_seq) is kept per target in the DB (table 'export_seq_marks').
+      The Foods are a small table - always written in full.
+    - Progress is reported in rows - progress(done, total), and a job cancelled meanwhile stops (see jobs.py):
+      a file being exported is removed, a file being imported is rolled back.
+"""
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import logging
+import os
+from datetime import datetime as dt
+from itertools import chain
+from typing import Iterable, Iterator, TextIO
+
+from calorie_count.src.DB import profiles
+from calorie_count.src.DB.food_db import FoodDB, Food
+from calorie_count.src.DB.meal_entry_db import MealEntryDB, MealEntry
+from calorie_count.src.DB.statements import Statements
+from calorie_count.src.utils import config
+from calorie_count.src.utils.jobs import Progress, reporting
+
+FOODS, MEAL_ENTRIES = 'foods', 'meal_entries'
+COLUMNS = {FOODS: Food.columns(), MEAL_ENTRIES: MealEntry.columns()}
+FORMATS = ('csv', 'jsonl')
+DEFAULT_NAME = 'Calorie_Counting'
+GZIP_LEVEL = 6  # (9 - gzip's default, is ~3 times slower for a few % smaller files)
+
+logger = logging.getLogger(__name__)
+
+SQL = Statements(
+    create_table='''CREATE TABLE if not exists export_seq_marks(
+                        target text PRIMARY KEY,
+                        last_seq integer
+                    )''',
+    get_mark="SELECT last_seq FROM export_seq_marks WHERE target = ?",
+    set_mark="INSERT OR REPLACE INTO export_seq_marks VALUES (?, ?)",
+)
+
+
+def _format(path: str) -> str:
+    """Helper function - the format of a file by its suffix (without '.gz')"""
+    fmt = path.removesuffix('.gz').rsplit('.', 1)[-1].lower()
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown format: {path} (expected a suffix of: {", ".join(FORMATS)}, optionally .gz)')
+    return fmt
+
+
+def _open(path: str, mode: str, compressed: bool = None) -> TextIO:
+    """Helper function - open a text file (gzip compressed - by default if its suffix is '.gz')"""
+    if path.endswith('.gz') if compressed is None else compressed:
+        return gzip.open(path, f'{mode}t', compresslevel=GZIP_LEVEL, encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def write_rows(fl: TextIO, fmt: str, columns: tuple[str, ...], rows: Iterable[tuple]) -> int:
+    """Write the rows (values of the columns) to a file. Returns the amount written."""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(fl)
+        writer.writerow(columns)
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+    else:
+        for count, row in enumerate(rows, 1):
+            fl.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            fl.write('\n')
+    return count
+
+
+def read_rows(fl: TextIO, fmt: str) -> tuple[tuple[str, ...], Iterator[tuple]]:
+    """Read the columns of a file and (lazily) its rows."""
+    if fmt == 'csv':
+        reader = csv.reader(fl)
+        return tuple(next(reader, ())), (tuple(row) for row in reader if row)
+    lines = (line for line in fl if line.strip())
+    first = next(lines, None)
+    if first is None:
+        return (), iter(())
+    columns = tuple(json.loads(first))
+    records = map(json.loads, chain([first], lines))
+    return columns, (tuple(record.get(c) for c in columns) for record in records)
+
+
+def _number(value) -> float | None:
+    """Helper function - a number read from a file (CSV values are strings, empty - None)"""
+    return None if value in (None, '') else float(value)
+
+
+def count_rows(table: str, seqs: tuple[int, int] = None) -> int:
+    """The amount of rows export_table would write"""
+    with (FoodDB() if table == FOODS else MealEntryDB()) as db:
+        return db.count() if table == FOODS else db.count(seqs)
+
+
+def export_table(path: str, table: str, seqs: tuple[int, int] = None, progress: Progress = None) -> int:
+    """Export a table (FOODS / MEAL_ENTRIES) to a file. Returns the amount of rows written.
+    seqs - only the meal-entries in the range (see MealEntryDB.iter_values).
+    (The file is written under a temporary name and then renamed - never left half written.)"""
+    fmt = _format(path)
+    partial = f'{path}.part'
+    total = count_rows(table, seqs) if progress is not None else None
+    try:
+        with (FoodDB() if table == FOODS else MealEntryDB()) as db, \
+                _open(partial, 'w', compressed=path.endswith('.gz')) as fl:
+            rows = db.iter_values() if table == FOODS else db.iter_values(seqs=seqs)
+            count = write_rows(fl, fmt, COLUMNS[table], reporting(rows, progress, total))
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    os.replace(partial, path)
+    logger.info(f'Exported {count} {table} to: {path}')
+    return count
+
+
+def export(directory: str, fmt: str = 'csv', compress: bool = True, name: str = DEFAULT_NAME,
+           incremental: bool = False, progress: Progress = None) -> list[str]:
+    """Export the Foods and the meal-entries to files in a directory. Returns their paths.
+    incremental => only the meal-entries added since the last export to this target (see module doc),
+    to a file named by the time of the export (the files of the previous exports are kept).
+    progress - of both files together (rows)."""
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown format: {fmt} (expected one of: {", ".join(FORMATS)})')
+    suffix = f'{fmt}{".gz" if compress else ""}'
+    foods_path = f'{directory}/{name}.{FOODS}.{suffix}'
+    seqs = target = None
+    if incremental:
+        target = _target(directory, name, fmt)
+        with MealEntryDB() as mdb:
+            last_seq = mdb.get_last_seq()  # (entries added while exporting are left to the next export)
+        seqs = (get_mark(target), last_seq)
+        entries_path = f'{directory}/{name}.{MEAL_ENTRIES}.{dt.now():%Y%m%dT%H%M%S%f}.{suffix}'
+    else:
+        entries_path = f'{directory}/{name}.{MEAL_ENTRIES}.{suffix}'
+
+    foods_progress = entries_progress = None
+    if progress is not None:
+        foods = count_rows(FOODS)
+        total = foods + count_rows(MEAL_ENTRIES, seqs)
+
+        def foods_progress(done, _total):
+            progress(done, total)
+
+        def entries_progress(done, _total):
+            progress(foods + done, total)
+
+    export_table(foods_path, FOODS, progress=foods_progress)
+    export_table(entries_path, MEAL_ENTRIES, seqs=seqs, progress=entries_progress)
+    if seqs is not None and seqs[1] > seqs[0]:
+        set_mark(target, seqs[1])
+    return [foods_path, entries_path]
+
+
+def _target(directory: str, name: str, fmt: str) -> str:
+    """Helper function - the key of an export target"""
+    return f'{os.path.abspath(directory)}/{name}.{fmt}'
+
+
+def _marks_db():
+    conn = profiles.connect(config.get_db_path())
+    conn.execute(SQL.create_table)
+    return conn
+
+
+def get_mark(target: str) -> int:
+    """The high-water mark of an export target - the sequence of the last meal-entry exported to it (0 - never)."""
+    conn = _marks_db()
+    try:
+        row = conn.execute(SQL.get_mark, (target,)).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else 0
+
+
+def set_mark(target: str, last_seq: int) -> None:
+    conn = _marks_db()
+    try:
+        conn.execute(SQL.set_mark, (target, last_seq))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def to_foods(rows: Iterable[tuple]) -> Iterator[Food]:
+    """The Foods of the rows of a Foods file (COLUMNS[FOODS])"""
+    for name, *values, _cals in rows:
+        yield Food(str(name), *map(_number, values))
+
+
+def to_meal_entries(rows: Iterable[tuple]) -> Iterator[MealEntry]:
+    """The entries of the rows of a meal-entries file (COLUMNS[MEAL_ENTRIES]) - with the nutrients of the file"""
+    for date, name, portion, *nutrients, _cals in rows:
+        proteins, fats, carbs, sugar, sodium, water = (_number(n) or 0 for n in nutrients)
+        yield MealEntry(name=str(name), portion=_number(portion), date=str(date)[:10], proteins=proteins, fats=fats,
+                        carbs=carbs, sugar=sugar, sodium=sodium, water=water)
+
+
+def _count_lines(path: str) -> int:
+    """Helper function - the amount of (non-empty) lines in a file (for the progress of importing it)"""
+    with _open(path, 'r') as fl:
+        return sum(1 for line in fl if line.strip())
+
+
+def import_file(path: str, progress: Progress = None) -> tuple[str, int]:
+    """Import a file of 'export_table' (the table is detected from its columns).
+    Returns the table and the amount of rows imported."""
+    fmt = _format(path)
+    total = None
+    if progress is not None:  # (a CSV value spanning lines is counted once per line - the total is an estimate)
+        total = max(_count_lines(path) - (fmt == 'csv'), 0)
+    with _open(path, 'r') as fl:
+        columns, rows = read_rows(fl, fmt)
+        table = next((t for t, c in COLUMNS.items() if c == columns), None)
+        if table is None:
+            raise ValueError(f'Invalid file: {path}\nExpected the columns of Foods: {COLUMNS[FOODS]}\n'
+                             f'or of meal entries: {COLUMNS[MEAL_ENTRIES]}\nGot: {columns}')
+        rows = reporting(rows, progress, total)
+        if table == FOODS:
+            with FoodDB() as fdb:
+                count = fdb.add_foods(to_foods(rows), update=True)
+        else:
+            with MealEntryDB() as mdb:
+                count = mdb.add_meal_entries(to_meal_entries(rows))
+    logger.info(f'Imported {count} {table} from: {path}')
+    return table, count
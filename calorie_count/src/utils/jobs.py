@@ -0,0 +1,95 @@
+"""This module holds the background jobs of the App "Job" (export, import, backup and restore).
+    - A job runs func(*args, progress=job.progress, **kwargs) on a worker thread - the UI never waits for it.
+    - func reports progress(done, total) as it goes (rows / pages, see 'reporting'). The UI polls Job.done and
+      Job.total - nothing is called on the UI thread from the worker thread.
+    - 'cancel' makes the next progress report raise Cancelled in the worker thread, so a job stops between rows -
+      and an import being cancelled is rolled back (see FoodDB.add_foods, MealEntryDB.add_meal_entries).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_EVERY = 500  # rows between progress reports (and cancellation checks)
+
+Progress = Callable[[int, Optional[int]], None]  # (done, total - None if unknown) -> None
+
+
+class Cancelled(Exception):
+    """Raised in the worker thread (by Job.progress) once the job was cancelled."""
+
+
+def reporting(rows: Iterable, progress: Optional[Progress], total: int = None, done: int = 0,
+              every: int = PROGRESS_EVERY) -> Iterator:
+    """Yield the rows, reporting progress(done, total) every 'every' rows and at the end.
+    done - the rows already done (e.g. of a previous table of the same job).
+    When progress raises (Cancelled) the rows are closed right away (e.g. the cursor of FoodDB.iter_values)."""
+    if progress is None:
+        yield from rows
+        return
+    try:
+        progress(done, total)
+        for done, row in enumerate(rows, done + 1):
+            yield row
+            if done % every == 0:
+                progress(done, total)
+        progress(done, total)
+    except BaseException:
+        if hasattr(rows, 'close'):
+            rows.close()
+        raise
+
+
+class Job:
+    """A function run on a worker thread - with progress and cancellation (see module doc)."""
+
+    def __init__(self, func: Callable, *args, **kwargs):
+        self.name = func.__name__
+        self.done, self.total = 0, None
+        self.result = self.error = None
+        self.completed = False  # (func returned - not cancelled and didn't fail)
+        self._func, self._args, self._kwargs = func, args, kwargs
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'job-{self.name}', daemon=True)
+
+    def start(self) -> Job:
+        self._thread.start()
+        return self
+
+    def progress(self, done: int, total: int = None) -> None:
+        """Report the progress (called by func). Raises Cancelled if the job was cancelled."""
+        self.done, self.total = done, total
+        if self._cancel.is_set():
+            raise Cancelled(self.name)
+
+    def cancel(self) -> None:
+        """Stop the job at its next progress report"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def join(self, timeout: float = None) -> bool:
+        """Wait for the job to finish. Returns False on timeout."""
+        return self._finished.wait(timeout)
+
+    def _run(self) -> None:
+        try:
+            self.result = self._func(*self._args, progress=self.progress, **self._kwargs)
+            self.completed = True
+        except Cancelled:
+            logger.info(f'Job {self.name} cancelled')
+        except Exception as e:  # (kept for the UI - the worker thread has no one else to tell)
+            logger.exception(f'Job {self.name} failed')
+            self.error = e
+        finally:
+            self._finished.set()
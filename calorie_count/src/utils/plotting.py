@@ -67,18 +67,26 @@ def plot_graph(
     data: dict[str, float],
     x_label: str = None,
     y_label: str = "Y",
+    lines: dict[str, dict[str, float]] = None,
 ):
     """Plot a graph of dates to values.
     e.g. plot_graph(data = {'2022-01-11': 100,
                             '2022-01-10': 100,
-                            '2022-01-09': 300}, y_label='Calories')"""
+                            '2022-01-09': 300}, y_label='Calories')
+    lines - more (dashed) lines over the same dates, by label (e.g. rolling averages)."""
+
+    def _strip_year(d: dict) -> dict:
+        return {"-".join(k.split("-")[1:]): v for k, v in d.items()}
 
     plt.rcParams.update(_RC_PARAMS)
-    data = {"-".join(k.split("-")[1:]): v for k, v in data.items()}  # removing year
+    data = _strip_year(data)
     if len(data) == 1:
         plt.bar(*zip(*data.items()), label=y_label)
     else:
         plt.plot(*zip(*data.items()), label=y_label)
+    for label, line in (lines or {}).items():
+        if line:
+            plt.plot(*zip(*_strip_year(line).items()), "--", marker=".", label=label)
     plt.legend()
 
     if x_label:
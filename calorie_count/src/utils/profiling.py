@@ -0,0 +1,131 @@
+"""This module holds the frame-budget instrumentation of the UI.
+    1. Decorate event handlers and Clock callbacks with @timed.
+    2. While the profiler is enabled their durations (and the dropped frames) are recorded,
+       and every call that blows the frame budget (consts.FRAME_BUDGET) is logged.
+    3. View the stats in-app (see components/frame_stats_overlay.py) or export them
+       as a trace file (Chrome trace-event format - open in chrome://tracing or ui.perfetto.dev).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from functools import wraps
+
+from calorie_count.src.utils import consts
+
+Logger = logging.getLogger('kivy')  # (the kivy Logger, without importing kivy)
+
+
+@dataclass
+class HandlerStats:
+    """The durations recorded for a single handler"""
+    calls: int = 0
+    total: float = 0  # (s)
+    max: float = 0  # (s)
+    over_budget: int = 0  # calls longer than the frame budget
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0
+
+
+class FrameProfiler:
+    """Records the durations of @timed handlers and the dropped frames (only while enabled)."""
+
+    def __init__(self, budget: float = consts.FRAME_BUDGET, max_events: int = 10_000):
+        self.budget = budget
+        self.enabled = False
+        self.stats: dict[str, HandlerStats] = defaultdict(HandlerStats)
+        self.events: deque[dict] = deque(maxlen=max_events)  # trace events
+        self.frames = 0
+        self.dropped_frames = 0
+        self._frame_event = None
+        self._start = time.perf_counter()
+
+    def enable(self) -> None:
+        """Start recording (and counting the frames with a kivy Clock callback)."""
+        if self.enabled:
+            return
+        from kivy.clock import Clock
+        self.enabled = True
+        self._frame_event = Clock.schedule_interval(self._on_frame, 0)
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self._frame_event:
+            self._frame_event.cancel()
+            self._frame_event = None
+
+    def reset(self) -> None:
+        self.stats.clear()
+        self.events.clear()
+        self.frames = self.dropped_frames = 0
+
+    def _on_frame(self, dt: float) -> None:
+        """Called every frame with the time since the last frame."""
+        self.frames += 1
+        dropped = round(dt / self.budget) - 1
+        if dropped > 0:
+            self.dropped_frames += dropped
+            self.events.append({'name': 'dropped frames', 'ph': 'C', 'ts': self._us(time.perf_counter()),
+                                'pid': 0, 'args': {'dropped': dropped}})
+
+    def _us(self, t: float) -> int:
+        """perf_counter time -> microseconds since the profiler was created (trace time-stamps)"""
+        return int((t - self._start) * 1e6)
+
+    def record(self, name: str, start: float, duration: float) -> None:
+        """Record a call of a handler (start is a perf_counter time)."""
+        stats = self.stats[name]
+        stats.calls += 1
+        stats.total += duration
+        stats.max = max(stats.max, duration)
+        if duration > self.budget:
+            stats.over_budget += 1
+            Logger.warning(f'FrameProfiler: {name} took {duration * 1000:.1f}ms '
+                           f'(budget: {self.budget * 1000:.1f}ms)')
+        self.events.append({'name': name, 'ph': 'X', 'ts': self._us(start), 'dur': int(duration * 1e6),
+                            'pid': 0, 'tid': threading.get_ident()})
+
+    def summary(self, top: int = 5) -> str:
+        """A human-readable summary of the slowest handlers."""
+        lines = [f'Frames: {self.frames}  Dropped: {self.dropped_frames}']
+        slowest = sorted(self.stats.items(), key=lambda x: x[1].max, reverse=True)[:top]
+        for name, s in slowest:
+            flag = ' (!)' if s.over_budget else ''
+            lines.append(f'{name}: max {s.max * 1000:.1f}ms, mean {s.mean * 1000:.1f}ms, '
+                         f'calls {s.calls}, over budget {s.over_budget}{flag}')
+        return '\n'.join(lines)
+
+    def export_trace(self, path: str) -> str:
+        """Write the recorded events as a trace file (Chrome trace-event format). Returns the path."""
+        with open(path, 'w') as fl:
+            json.dump({'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}, fl)
+        return path
+
+
+profiler = FrameProfiler()
+
+
+def timed(func=None, *, name: str = None):
+    """Decorator recording the duration of every call of an event handler / Clock callback
+    (when the profiler is enabled). Usage: @timed or @timed(name='...')"""
+    if func is None:
+        return lambda f: timed(f, name=name)
+    name = name or func.__qualname__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not profiler.enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.record(name, start, time.perf_counter() - start)
+
+    return wrapper
@@ -1,72 +1,81 @@
-""" Here we store Excel utilities """
+""" Here we store Excel utilities
+Both report their progress in rows - progress(done, total), and stop if their job is cancelled (see jobs.py) -
+an import being cancelled is rolled back (the Foods and the entries are imported in a single transaction)."""
+import logging
+
 import openpyxl
 
+from calorie_count.src.DB import changes
 from calorie_count.src.DB.food_db import FoodDB, Food
 from calorie_count.src.DB.meal_entry_db import MealEntryDB, MealEntry
+from calorie_count.src.utils import interchange
+from calorie_count.src.utils.jobs import Progress, reporting
 
 DEFAULT_XLSX = 'Calorie_Counting.xlsx'
 FOOD_SHEET = 'My Foods'
 MEALS_SHEET = 'My Meal Entries'
 
+logger = logging.getLogger(__name__)
+
 
-def save_to_excel(path: str = DEFAULT_XLSX, *args) -> None:
+def save_to_excel(path: str = DEFAULT_XLSX, *args, progress: Progress = None) -> None:
     """Save Foods and entries to xlsx file
     The file will have 2 sheets: 'My Foods' and 'My Meal Entries'"""
     wb = openpyxl.Workbook()
+    with FoodDB() as fdb, MealEntryDB() as mdb:
+        foods = fdb.count()
+        total = foods + mdb.count()
+
+        # --1-- Creating Foods sheet
+        wb.active.title = FOOD_SHEET
+        wb.active.append(Food.columns())
+        for values in reporting(fdb.iter_values(), progress, total):
+            wb.active.append(values)
 
-    # --1-- Creating Foods sheet
-    wb.active.title = FOOD_SHEET
-    with FoodDB() as fdb:
-        foods = fdb.get_all_foods()
-    if foods:
-        wb.active.append(foods[0].columns())
-        for food in foods:
-            wb.active.append(food.values)
-
-    # --2-- Creating meals sheet
-    sh = wb.create_sheet(MEALS_SHEET)
-    with MealEntryDB() as mdb:
-        start, end = map(str, mdb.get_first_last_dates())
-        entries = mdb.get_entries_between_dates(start, end)
-        print(entries)
-    if entries:
+        # --2-- Creating meals sheet
+        sh = wb.create_sheet(MEALS_SHEET)
         sh.append(MealEntry.columns())
-        for entry in entries:
-            sh.append(entry.values)
+        for values in reporting(mdb.iter_values(), progress, total, done=foods):
+            sh.append(values)
 
     # --3-- Saving Workbook
-    print(f'Saving file here:', path)
+    logger.info(f'Saving file here: {path}')
     wb.save(path)
 
 
-def import_excel(path: str = DEFAULT_XLSX, *args) -> None:
+def _rows(wb: openpyxl.Workbook, sheet: str, columns: tuple[str, ...]):
+    """Helper function - the rows of a sheet (without its headers and empty rows)"""
+    gen = wb[sheet].iter_rows(values_only=True)
+    headers = next(gen, ())
+    if headers != columns:
+        raise ValueError(f'Invalid Sheet: {sheet}\nExpected: {columns}\nGot: {headers}')
+    return (row for row in gen if any(value is not None for value in row))
+
+
+def import_excel(path: str = DEFAULT_XLSX, *args, progress: Progress = None) -> None:
     """Load Foods and entries from xlsx file
     The file must have 2 sheets: 'My Foods' and 'My Meal Entries'
-    The entries are added to the existing entries."""
+    The Foods are updated, the entries are added to the existing entries (as they were - their nutrients are
+    read from the sheet)."""
     wb = openpyxl.load_workbook(path)
+    foods = _rows(wb, FOOD_SHEET, Food.columns())
+    entries = _rows(wb, MEALS_SHEET, MealEntry.columns())
+    n_entries = max(wb[MEALS_SHEET].max_row - 1, 0)
+    total = n_entries + max(wb[FOOD_SHEET].max_row - 1, 0)
 
-    # --1-- Reading Foods sheet
-
-    gen = wb[FOOD_SHEET].iter_rows(values_only=True)
-    headers = next(gen)
-    assert headers == Food.columns(), f'Invalid Sheet: {FOOD_SHEET}\n' \
-                                      f'Expected: {Food.columns}\nGot: {headers}'
-    with FoodDB() as fdb:
-        for row in gen:
-            food = Food(*row)
-            fdb.add_food(food, update=True)
-
-    # --2-- Reading meals sheet
-    gen = wb[MEALS_SHEET].iter_rows(values_only=True)
-    headers = next(gen)
-    assert headers == MealEntry.columns(), f'Invalid Sheet: {MEALS_SHEET}\n' \
-                                           f'Expected: {MealEntry.columns}\nGot: {headers}'
-    with MealEntryDB() as mdb:
-        for row in gen:
-            date, name, portion, *_ = row
-            entry = MealEntry(name=name, date=date, portion=portion)
-            mdb.add_meal_entry(entry)
-    print(f'{path} Loaded!')
+    # (the entries first - adding them flushes the write-behind queue, which can't write inside our transaction)
+    with MealEntryDB() as mdb, FoodDB(conn=mdb.conn) as fdb:  # (one transaction)
+        try:
+            mdb.add_meal_entries(interchange.to_meal_entries(reporting(entries, progress, total)), commit=False)
+            fdb.add_foods(interchange.to_foods(reporting(foods, progress, total, done=n_entries)), update=True,
+                          commit=False)
+            mdb.conn.commit()
+        except BaseException:
+            mdb.conn.rollback()
+            raise
+    changes.publish(changes.FOOD)
+    changes.publish(changes.MEAL_ENTRIES)
+    logger.info(f'{path} Loaded!')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,94 @@
+""" Reproducible synthetic datasets for the DB benchmarks.
+
+The same seed always generates the same rows, so benchmark runs on different changes are comparable.
+Rows are written with executemany straight into the tables the DB classes create.
+"""
+from __future__ import annotations
+
+import random
+import sqlite3
+from datetime import date, timedelta
+from typing import Iterator
+
+from calorie_count.src.DB import profiles
+from calorie_count.src.DB.external.client import ExternalFoodsDB
+from calorie_count.src.DB.food_db import FoodDB
+from calorie_count.src.DB.meal_entry_db import MealEntryDB
+
+WORDS = ('apple', 'banana', 'bread', 'rice', 'chicken', 'beef', 'salmon', 'tuna', 'egg', 'milk', 'cheese',
+         'yogurt', 'oats', 'pasta', 'potato', 'tomato', 'carrot', 'lentils', 'beans', 'tofu', 'almond',
+         'peanut', 'butter', 'honey', 'chocolate', 'orange', 'grape', 'spinach', 'broccoli', 'corn')
+STYLES = ('raw', 'boiled', 'baked', 'fried', 'grilled', 'dried', 'smoked', 'whole', 'sliced', 'canned')
+PORTIONS = ('cup', 'bowl', 'slice', 'piece', 'tbsp', 'tsp', 'serving')
+
+FOOD_COLUMNS = ('name', 'portion', 'protein', 'fats', 'carbs', 'sugar', 'sodium', 'water', 'id')
+MEAL_ENTRY_COLUMNS = ('meal_id', 'portion', 'date', 'id')
+EXTERNAL_FOOD_COLUMNS = ('description', 'portions', 'protein', 'fats', 'carbs', 'sodium', 'sugar', 'water')
+EATEN_RATIO = 0.8  # the meal-entries reference only the first foods (the rest can be deleted outright)
+_BATCH = 50_000
+
+
+def food_name(rnd: random.Random, i: int) -> str:
+    """A unique readable food name (the index keeps it unique)"""
+    return f'{rnd.choice(WORDS)} {rnd.choice(STYLES)} {rnd.choice(WORDS)} #{i}'
+
+
+def food_rows(n: int, seed: int = 0) -> Iterator[tuple]:
+    """Rows of the 'food' table (name, portion, protein, fats, carbs, sugar, sodium, water, id)"""
+    rnd = random.Random(seed)
+    for i in range(n):
+        name = food_name(rnd, i)
+        protein, fats, carbs = (round(rnd.uniform(0, 40), 1) for _ in range(3))
+        yield (name, rnd.choice((50, 100, 150, 200, 250)), protein, fats, carbs, round(rnd.uniform(0, carbs), 1),
+               round(rnd.uniform(0, 800), 1), round(rnd.uniform(0, 90), 1), name)
+
+
+def meal_entry_rows(n: int, food_ids: list[str], days: int, end: date = date(2024, 1, 1),
+                    seed: int = 0) -> Iterator[tuple]:
+    """Rows of the 'meal_entries' table (meal_id, portion, date, id), spread over 'days' days ending at 'end'."""
+    rnd = random.Random(seed)
+    start = end - timedelta(days=days - 1)
+    for i in range(n):
+        day = start + timedelta(days=i * days // n)  # sorted by date like real usage
+        yield rnd.choice(food_ids), rnd.choice((50, 100, 150, 200, 250)), day.isoformat(), f'{day}T{i:09d}'
+
+
+def external_food_rows(n: int, seed: int = 0) -> Iterator[tuple]:
+    """Rows of the external 'foods' table (description, portions, protein, fats, carbs, sodium, sugar, water)"""
+    rnd = random.Random(seed)
+    for i in range(n):
+        portions = ','.join(f'{p}:{rnd.randint(5, 300)}' for p in rnd.sample(PORTIONS, 2))
+        yield (food_name(rnd, i).title(), portions, *(round(rnd.uniform(0, 40), 1) for _ in range(3)),
+               round(rnd.uniform(0, 800), 1), round(rnd.uniform(0, 20), 1), round(rnd.uniform(0, 90), 1))
+
+
+def _insert(conn: sqlite3.Connection, table: str, rows: Iterator[tuple], columns: tuple[str, ...]) -> None:
+    cmd = f'INSERT INTO {table} ({",".join(columns)}) VALUES ({",".join("?" * len(columns))})'
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == _BATCH:
+            conn.executemany(cmd, batch)
+            batch.clear()
+    conn.executemany(cmd, batch)
+    conn.commit()
+
+
+def populate(db_path: str, foods: int, entries: int, days: int, seed: int = 0) -> list[str]:
+    """Fill a (new) App DB with 'foods' foods and 'entries' meal-entries over 'days' days.
+    Returns the food names (the ones after EATEN_RATIO are not referenced by any meal-entry)."""
+    with profiles.using('bulk-import'), FoodDB(db_path) as fdb:
+        _insert(fdb.conn, 'food', food_rows(foods, seed), FOOD_COLUMNS)
+        names = [name for name, in fdb.conn.execute('SELECT name FROM food ORDER BY rowid')]
+    with profiles.using('bulk-import'), MealEntryDB(db_path) as mdb:
+        eaten = names[:max(1, int(len(names) * EATEN_RATIO))]
+        _insert(mdb.conn, 'meal_entries', meal_entry_rows(entries, eaten, days, seed=seed), MEAL_ENTRY_COLUMNS)
+        mdb.backfill_snapshots()  # (the nutrient snapshots from the foods - as migrating an old DB)
+        mdb.conn.commit()
+    return names
+
+
+def populate_external(foods: int, seed: int = 0) -> None:
+    """Fill the external foods DB ('external_foods' found from the working directory) with 'foods' foods."""
+    with profiles.using('bulk-import'), ExternalFoodsDB(locally=True) as edb:
+        _insert(edb.conn, 'foods', external_food_rows(foods, seed), EXTERNAL_FOOD_COLUMNS)
@@ -0,0 +1,193 @@
+""" DB benchmark of the Calorie App.
+
+Generates reproducible synthetic datasets (see datasets.py) in a temporary directory and times the key DB operations:
+    autocomplete, daily load, trend range (entries / columns), external search (exact and fuzzy),
+    xlsx export/import, CSV export/import and bulk delete.
+Each operation is repeated and its min and median times are recorded.
+Comparing to a previous report (--baseline) lists the operations that regressed (and exits with 1).
+
+Usage:
+    python -m calorie_count.tests.benchmarks.db [-o report.json] [--baseline old.json]
+    python -m calorie_count.tests.benchmarks.db --foods 10000 --entries 100000  # (a quicker run)
+Note: At the default sizes (1M entries) the per-entry DB lookups make a full run take several minutes.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Callable
+from unittest import mock
+
+from calorie_count.src.DB import profiles
+from calorie_count.src.utils import config
+from calorie_count.tests.benchmarks import datasets
+
+END_DATE = date(2024, 1, 1)
+
+
+def measure(func: Callable, repeat: int) -> dict:
+    """Run func 'repeat' times (with the run index) and get the min and median times (seconds)"""
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        func(i)
+        times.append(time.perf_counter() - start)
+    return {'min': min(times), 'median': statistics.median(times), 'runs': repeat}
+
+
+@contextmanager
+def benchmark_env():
+    """A temporary working directory (with an 'external_foods' DB) and a DB path the DB classes use."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'benchmark.db')
+        open(os.path.join(tmp, 'external_foods'), 'w').close()
+        os.chdir(tmp)
+        try:
+            with mock.patch.object(config, 'get_db_path', return_value=db_path):
+                yield tmp, db_path
+        finally:
+            os.chdir(cwd)
+
+
+def operations(names: list[str], args: argparse.Namespace, tmp: str) -> dict[str, Callable[[int], object]]:
+    """The benchmarked operations (each gets the run index)"""
+    from calorie_count.src.DB.external.client import ExternalFoodsDB
+    from calorie_count.src.DB.food_db import FoodDB
+    from calorie_count.src.DB.meal_entry_db import MealEntryDB, daily_sums
+    from calorie_count.src.utils.utils import sort_by_similarity
+
+    def autocomplete(i):  # (as CaloriesApp.on_name_entered_in_add_entry_screen)
+        with FoodDB() as db:
+            return sort_by_similarity(db.get_all_food_names(), names[i][:4])[:5]
+
+    def daily_load(i):
+        day = (END_DATE - timedelta(days=i)).isoformat()
+        with MealEntryDB() as db:
+            return db.get_entries_between_dates(day, day)
+
+    def trend_range(i):
+        start = (END_DATE - timedelta(days=args.trend_days - 1 + i)).isoformat()
+        with MealEntryDB() as db:
+            return db.get_entries_between_dates(start, (END_DATE - timedelta(days=i)).isoformat())
+
+    def trend_columns(i):  # (as CaloriesApp.generate_trend)
+        start = (END_DATE - timedelta(days=args.trend_days - 1 + i)).isoformat()
+        with MealEntryDB() as db:
+            return daily_sums(db.get_columns_between_dates(start, (END_DATE - timedelta(days=i)).isoformat()))
+
+    def search(i):
+        with ExternalFoodsDB() as db:
+            return list(db.get_similar_food_by_name(datasets.WORDS[i]))
+
+    def search_fuzzy(i):  # no LIKE match -> edit-distance over the whole table
+        with ExternalFoodsDB() as db:
+            return list(db.get_similar_food_by_name(datasets.WORDS[i][::-1] + 'x'))
+
+    def xlsx_export(i):
+        from calorie_count.src.utils import xlsx
+        xlsx.save_to_excel(os.path.join(tmp, f'export_{i}.xlsx'))
+
+    def xlsx_import(i):
+        from calorie_count.src.utils import xlsx
+        xlsx.import_excel(os.path.join(tmp, f'export_{i}.xlsx'))
+
+    def csv_export(i):
+        from calorie_count.src.utils import interchange
+        interchange.export(tmp, 'csv', compress=True, name=f'export_{i}')
+
+    def csv_import(i):  # (the meal-entries only - the foods are already there)
+        from calorie_count.src.utils import interchange
+        interchange.import_file(os.path.join(tmp, f'export_{i}.{interchange.MEAL_ENTRIES}.csv.gz'))
+
+    def bulk_delete(i):
+        with FoodDB() as db:
+            db.remove(names[-(i + 1) * args.delete:][:args.delete])
+
+    ops = dict(autocomplete=autocomplete, daily_load=daily_load, trend_range=trend_range,
+               trend_columns=trend_columns, search=search, search_fuzzy=search_fuzzy, xlsx_export=xlsx_export,
+               xlsx_import=xlsx_import, csv_export=csv_export, csv_import=csv_import, bulk_delete=bulk_delete)
+    return {name: op for name, op in ops.items() if not args.only or name in args.only}
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Run the whole benchmark and return the report."""
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline', 'only')},
+        'setup': {},
+        'results': {},
+    }
+    with benchmark_env() as (tmp, db_path):
+        start = time.perf_counter()
+        names = datasets.populate(db_path, args.foods, args.entries, args.days, args.seed)
+        report['setup']['populate'] = time.perf_counter() - start
+        start = time.perf_counter()
+        datasets.populate_external(args.external, args.seed)
+        report['setup']['populate_external'] = time.perf_counter() - start
+
+        with profiles.using(args.profile):
+            for name, op in operations(names, args, tmp).items():
+                try:
+                    report['results'][name] = measure(op, args.repeat)
+                except Exception as e:  # e.g. missing optional dependency - recorded, not fatal
+                    report['results'][name] = {'error': f'{type(e).__name__}: {e}'}
+    return report
+
+
+def regressions(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """The operations whose median time grew by more than 'tolerance' (a ratio) compared to a baseline report."""
+    ret = []
+    for name, result in report['results'].items():
+        old = baseline.get('results', {}).get(name, {})
+        if 'median' in result and 'median' in old and result['median'] > old['median'] * (1 + tolerance):
+            ret.append(f'{name}: {old["median"] * 1000:.1f}ms -> {result["median"] * 1000:.1f}ms')
+    return ret
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-o', '--output', help='Path of JSON report (default: stdout)')
+    parser.add_argument('--foods', type=int, default=100_000, help='Number of foods (default: %(default)s)')
+    parser.add_argument('--entries', type=int, default=1_000_000, help='Number of meal-entries (default: %(default)s)')
+    parser.add_argument('--days', type=int, default=5 * 365, help='Days the entries span (default: %(default)s)')
+    parser.add_argument('--external', type=int, default=50_000, help='Number of external foods (default: %(default)s)')
+    parser.add_argument('--trend-days', type=int, default=30, help='Days in the trend range (default: %(default)s)')
+    parser.add_argument('--delete', type=int, default=1_000, help='Foods per bulk delete (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per operation (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', default='interactive', choices=profiles.PROFILES,
+                        help='DB connection profile of the operations (default: %(default)s)')
+    parser.add_argument('--only', nargs='*', help='Run only these operations')
+    parser.add_argument('--baseline', help='Previous JSON report to compare to')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed slow-down ratio before a regression is reported (default: %(default)s)')
+    args = parser.parse_args()
+
+    report = run(args)
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as fl:
+            fl.write(report_json)
+    else:
+        print(report_json)
+
+    if args.baseline:
+        with open(args.baseline) as fl:
+            slower = regressions(report, json.load(fl), args.tolerance)
+        for line in slower:
+            print(f'Regression: {line}', file=sys.stderr)
+        sys.exit(1 if slower else 0)
+
+
+if __name__ == '__main__':
+    main()
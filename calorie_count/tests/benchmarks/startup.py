@@ -0,0 +1,108 @@
+""" Startup benchmark of the Calorie App.
+
+Records:
+    1. The cold import time of each heavy module (each in a fresh interpreter).
+    2. The time of CaloriesApp.build, Builder.load_file(MAIN_KV) and _post_build_
+       and the time to the first frame (with a hidden window).
+
+Usage:
+    python -m calorie_count.tests.benchmarks.startup [-o report.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+MODULES = ('kivy', 'kivymd', 'matplotlib.pyplot', 'openpyxl', 'calorie_count.src.main')
+
+
+def import_time(module: str) -> float:
+    """Get the cold import time (seconds) of a module, using a fresh interpreter with '-X importtime'."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          capture_output=True, text=True, env={**os.environ, 'KIVY_NO_ARGS': '1'})
+    if proc.returncode:
+        raise RuntimeError(f'Failed importing {module}:\n{proc.stderr}')
+    # lines look like: "import time:       self [us] |  cumulative | imported package"
+    for line in reversed(proc.stderr.splitlines()):
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        if name.strip() == module:
+            return int(cumulative) / 1e6
+    raise RuntimeError(f'No import time found for {module}')
+
+
+def app_timings() -> dict[str, float]:
+    """Run the App with a hidden window until its first frame, timing the startup phases."""
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+    from kivy.config import Config
+    Config.set('graphics', 'window_state', 'hidden')
+
+    start = time.perf_counter()
+    from kivy.clock import Clock
+    from kivy.lang import Builder
+
+    from calorie_count.src import main
+    timings = {'import calorie_count.src.main': time.perf_counter() - start}
+
+    def _timed(name: str, func):
+        def wrapper(*args, **kwargs):
+            start_ = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings[name] = time.perf_counter() - start_
+        return wrapper
+
+    class BenchmarkApp(main.CaloriesApp):
+        build = _timed('CaloriesApp.build', main.CaloriesApp.build)
+
+        def _post_build_(self, *a, **k):
+            timings['time_to_first_frame'] = time.perf_counter() - main._START_TIME
+            _timed('CaloriesApp._post_build_', super()._post_build_)(*a, **k)
+            Clock.schedule_once(self.stop)
+
+    load_file = Builder.load_file
+    Builder.load_file = _timed('Builder.load_file(MAIN_KV)', load_file)
+    try:
+        BenchmarkApp().run()
+    finally:
+        Builder.load_file = load_file
+    return timings
+
+
+def run() -> dict:
+    """Run the whole benchmark and return the report."""
+    from calorie_count.src.utils import consts
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'imports': {module: import_time(module) for module in MODULES},
+        'app': app_timings(),
+        'first_frame_target': consts.FIRST_FRAME_TARGET,
+    }
+    report['first_frame_ok'] = report['app']['time_to_first_frame'] <= consts.FIRST_FRAME_TARGET
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-o', '--output', help='Path of JSON report (default: stdout)')
+    args = parser.parse_args()
+
+    report = json.dumps(run(), indent=2)
+    if args.output:
+        with open(args.output, 'w') as fl:
+            fl.write(report)
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
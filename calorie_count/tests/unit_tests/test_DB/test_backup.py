@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from calorie_count.src.DB import backup, changes
+from calorie_count.src.DB.food_db import FoodDB, Food
+from calorie_count.src.DB.meal_entry_db import MealEntry, MealEntryDB
+from calorie_count.src.utils import config
+
+
+class TestBackup(unittest.TestCase):
+
+    def setUp(self):
+        config.set_db_path_test()
+        with FoodDB() as fdb:
+            fdb.add_food(Food('apple', 100, 0.5, 0.2, 10, 4, 0, 86))
+        with MealEntryDB() as mdb:
+            self.entry = mdb.add_meal_entry(MealEntry(name='apple', date='2022-01-01'))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, f'backup{backup.SUFFIX}')
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_backup_and_restore(self):
+        steps = []
+        backup.backup(self.path, progress=lambda done, total: steps.append((done, total)), pages=1)
+        self.assertGreater(len(steps), 1)  # (page by page)
+        self.assertEqual(steps[-1][0], steps[-1][1])
+        self.assertFalse(os.path.exists(f'{self.path}.part'))
+
+        # Changes after the backup are undone by the restore
+        with FoodDB() as fdb:
+            fdb.remove(['apple'])
+        with MealEntryDB() as mdb:
+            mdb.delete_entry(self.entry.id)
+        version = changes.version(changes.MEAL_ENTRIES)
+
+        backup.restore(self.path)
+        self.assertGreater(changes.version(changes.MEAL_ENTRIES), version)
+        with FoodDB() as fdb:
+            self.assertEqual(fdb.get_food_by_name('apple').carbs, 10)
+        with MealEntryDB() as mdb:
+            self.assertEqual(mdb.get_entries_between_dates('2022-01-01', '2022-01-01'), [self.entry])
+
+    def test_restore_invalid(self):
+        with open(self.path, 'wb') as fl:
+            fl.write(b'not a backup')
+        with self.assertRaises(ValueError):
+            backup.restore(self.path)
+        with FoodDB() as fdb:  # (left as is)
+            self.assertEqual(fdb.get_all_food_names(), ['apple'])
+
+
+if __name__ == '__main__':
+    unittest.main()
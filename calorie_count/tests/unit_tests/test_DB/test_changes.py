@@ -0,0 +1,45 @@
+import unittest
+
+from calorie_count.src.DB import changes
+from calorie_count.src.DB.food_db import FoodDB, Food
+from calorie_count.src.DB.meal_entry_db import MealEntryDB
+from calorie_count.src.utils import config
+
+
+class TestChanges(unittest.TestCase):
+
+    def setUp(self):
+        config.set_db_path_test()
+        self.db = FoodDB()
+        with MealEntryDB():  # So table will exist as well
+            pass
+        self.published = []
+        changes.subscribe(changes.FOOD, self._on_change)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        changes.unsubscribe(changes.FOOD, self._on_change)
+        self.db.conn.close()
+
+    def _on_change(self, table, version, details):
+        self.published.append((table, version, details))
+
+    def test_publish(self):
+        version = changes.version(changes.FOOD)
+        self.assertEqual(changes.publish(changes.FOOD, names=['apple']), version + 1)
+        self.assertEqual(self.published, [(changes.FOOD, version + 1, {'names': ['apple']})])
+
+    def test_food_db_publishes(self):
+        version = changes.version(changes.FOOD)
+        self.db.add_food(Food('apple', 100, 0.5, 0.2, 10, 4, 0, 86))
+        self.db.remove(['apple'])
+        self.assertEqual(changes.version(changes.FOOD), version + 2)
+        self.assertEqual([details for *_, details in self.published], [{'names': ['apple']}] * 2)
+
+    def test_unchanged_versions(self):
+        self.assertEqual(changes.versions(changes.FOOD, changes.MEAL_ENTRIES),
+                         changes.versions(changes.FOOD, changes.MEAL_ENTRIES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -27,6 +27,15 @@ class TestFoodDB(unittest.TestCase):
         # Check that the food was removed successfully
         self.assertNotIn('apple', self.db.get_all_food_names())
 
+    def test_remove_many(self):
+        for name in ('apple', 'banana', 'orange'):
+            self.db.add_food(Food(name, 100, 0.5, 0.2, 10, 4, 0, 86))
+        # (more names than SQLite's variables limit, duplicates and names not in the DB)
+        self.db.remove(['apple', 'orange', 'apple'] + [f'food{i}' for i in range(40_000)])
+        self.assertEqual(self.db.get_all_food_names(), ['banana'])
+        self.db.remove(['banana'])  # (the temp table is dropped)
+        self.assertEqual(self.db.get_all_food_names(), [])
+
     def test_add_food(self):
         # Create a new food
         food = Food('apple', 100, 0.5, 0.2, 10, 4, 0, 86)
@@ -71,6 +80,70 @@ class TestFoodDB(unittest.TestCase):
         self.assertEqual(food.sodium, 0)
         self.assertEqual(food.water, 86)
 
+    def test_get_foods_page(self):
+        # Add Foods to the database
+        for i in range(7):
+            self.db.add_food(Food(f'food{i}', 100, i, 0.2, 10 - i, 4, 0, 86))
+
+        # Get all the pages sorted by name
+        names, after = [], None
+        while True:
+            foods, after = self.db.get_foods_page(after, limit=3)
+            if not foods:
+                break
+            names += [f.name for f in foods]
+        self.assertEqual(names, [f'food{i}' for i in range(7)])
+
+        # Sorted descending by Carbs
+        foods, _ = self.db.get_foods_page(order_by='Carbs (g)', descending=True, limit=2)
+        self.assertEqual([f.name for f in foods], ['food0', 'food1'])
+
+        # Filtered
+        foods, _ = self.db.get_foods_page(filter_by='Protein (g)', filter_text='>=5')
+        self.assertEqual([f.name for f in foods], ['food5', 'food6'])
+        foods, _ = self.db.get_foods_page(filter_text='food3')
+        self.assertEqual([f.name for f in foods], ['food3'])
+        self.db.add_food(Food('50%_off', 100, 1, 1, 1, 0, 0, 0))
+        foods, _ = self.db.get_foods_page(filter_text='%_')  # (wildcards are searched as they are)
+        self.assertEqual([f.name for f in foods], ['50%_off'])
+
+        # NULL numbers (e.g. imported) are paged as 0
+        self.db.add_food(Food('unknown', 100, None, None, None, 0, 0, 0))
+        names, after = [], None
+        while True:
+            foods, after = self.db.get_foods_page(after, order_by='Protein (g)', limit=3)
+            if not foods:
+                break
+            names += [f.name for f in foods]
+        self.assertEqual(names[:2], ['food0', 'unknown'])  # (protein 0 - by name)
+        self.assertEqual(len(names), 9)
+
+    def test_identity_map(self):
+        self.db.add_food(Food('apple', 100, 0.5, 0.2, 10, 4, 0, 86))
+
+        # The same Food is shared by all the loads
+        food = self.db.get_food_by_name('apple')
+        self.assertIs(self.db.get_food_by_id('apple'), food)
+        with self.assertRaises(AttributeError):  # (immutable)
+            food.carbs = 20
+
+        # A change to the Food drops it from the map
+        self.db.remove(['apple'])
+        self.db.add_food(Food('apple', 100, 0.5, 0.2, 20, 4, 0, 76))
+        self.assertEqual(self.db.get_food_by_name('apple').carbs, 20)
+
+    def test_quoted_names(self):
+        name = "Ben & Jerry's \"Chunky\" Monkey"
+        self.db.add_food(Food(name, 100, 4, 15, 28, 24, 0.1, 50))
+        self.assertEqual(self.db.get_food_by_name(name).fats, 15)
+
+        # update => the existing Food is replaced
+        self.db.add_food(Food(name, 100, 4, 16, 28, 24, 0.1, 50), update=True)
+        self.assertEqual(self.db.get_food_by_id(name).fats, 16)
+
+        self.db.remove([name, "O'Reilly"])
+        self.assertNotIn(name, self.db.get_all_food_names())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,69 @@
+import sqlite3
+import time
+import unittest
+from datetime import datetime as dt
+from datetime import timedelta
+
+from calorie_count.src.DB import maintenance, profiles
+from calorie_count.src.DB.meal_entry_db import MealEntryDB
+from calorie_count.src.utils import config
+
+
+class TestMaintenance(unittest.TestCase):
+
+    def setUp(self):
+        config.set_db_path_test()
+        with profiles.using('interactive'), MealEntryDB():  # (WAL and incremental auto-vacuum)
+            pass
+        self.scheduler = maintenance.MaintenanceScheduler()
+        super().setUp()
+
+    def test_run(self):
+        names = [task.name for task in maintenance.TASKS]
+        self.assertEqual([task.name for task in self.scheduler.due()], names)
+        with profiles.using('interactive'):
+            self.assertEqual(self.scheduler.run(budget=5, long=True), names)
+        self.assertEqual(self.scheduler.due(), [])  # (recorded)
+        self.assertEqual(set(self.scheduler.last_runs()), set(names))
+
+        # Due again once its interval passed
+        later = dt.now() + timedelta(hours=1)
+        self.assertEqual([task.name for task in self.scheduler.due(later)], ['wal_checkpoint'])
+
+    def test_time_boxed(self):
+        def slow(conn):  # (a statement running ~forever - interrupted once the budget is over)
+            conn.execute('WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT MAX(i) FROM n')
+            return True
+
+        scheduler = maintenance.MaintenanceScheduler(tasks=[maintenance.Task('slow', timedelta(days=1), slow)])
+        start = time.perf_counter()
+        self.assertEqual(scheduler.run(budget=0.05), [])
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(len(scheduler.due()), 1)  # (retried on a later slice)
+        start = time.perf_counter()
+        self.assertEqual(scheduler.run(budget=0.05), [])  # (backed off - not even started)
+        self.assertLess(time.perf_counter() - start, 0.05)
+
+    def test_short_slice_skips_tasks_that_cant_resume(self):
+        with profiles.using('interactive'):
+            done = self.scheduler.run(budget=5)
+        self.assertNotIn('integrity_check', done)
+        self.assertIn('wal_checkpoint', done)
+        self.assertEqual(self.scheduler.run(budget=None), ['analyze', 'integrity_check'])  # (no budget - they run)
+
+    def test_busy_task_is_skipped(self):
+        def busy(conn):
+            raise sqlite3.OperationalError('database is locked')
+
+        scheduler = maintenance.MaintenanceScheduler(tasks=[maintenance.Task('busy', timedelta(days=1), busy),
+                                                            maintenance.Task('quick', timedelta(days=1), lambda conn: True)])
+        self.assertEqual(scheduler.run(budget=5), ['quick'])  # (the next task runs)
+
+    def test_run_in_background(self):
+        self.assertTrue(self.scheduler.run_in_background(budget=5, long=True))
+        self.scheduler.join(timeout=5)
+        self.assertEqual(self.scheduler.due(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,11 +6,12 @@ Though a bit hacky, This patch seems simpler than injecting the test FoodDB
 to MealEntryDB who injects it to MealEntry Objects.
 
 """
+import sqlite3
 import unittest
 from unittest.mock import patch
 
 from calorie_count.src.DB.food_db import FoodDB, Food
-from calorie_count.src.DB.meal_entry_db import MealEntry, MealEntryDB
+from calorie_count.src.DB.meal_entry_db import MealEntry, MealEntryDB, daily_sums
 from calorie_count.src.utils import config
 
 
@@ -47,8 +48,8 @@ class TestFoodDB(unittest.TestCase):
         # Test deleting a meal entry
         entry = MealEntry(name="apple", date="2022-12-15", portion=100)
         with MealEntryDB() as mdb:
-            mdb.add_meal_entry(entry)
-            self.assertEqual(len(mdb.get_entries_between_dates("2022-12-15", "2022-12-15")), 1)
+            entry = mdb.add_meal_entry(entry)
+            self.assertEqual(mdb.get_entries_between_dates("2022-12-15", "2022-12-15"), [entry])
             mdb.delete_entry(entry.id)
             # Check that the entry was deleted from the database
             self.assertEqual(len(mdb.get_entries_between_dates("2022-12-15", "2022-12-15")), 0)
@@ -80,15 +81,66 @@ class TestFoodDB(unittest.TestCase):
         meal_entry2 = MealEntry(name='banana', date='2022-01-02')
         meal_entry3 = MealEntry(name='orange', date='2022-01-03')
         with MealEntryDB() as mdb:
-            mdb.add_meal_entry(meal_entry1)
-            mdb.add_meal_entry(meal_entry2)
-            mdb.add_meal_entry(meal_entry3)
+            meal_entry1, meal_entry2, meal_entry3 = map(mdb.add_meal_entry, (meal_entry1, meal_entry2, meal_entry3))
             # Verify expected list of MealEntry
             start_date = '2022-01-02'
             end_date = '2022-01-03'
             expected_entries = [meal_entry2, meal_entry3]
             assert mdb.get_entries_between_dates(start_date, end_date) == expected_entries
 
+    @patch('calorie_count.src.DB.food_db.FoodDB.__enter__')
+    def test_get_columns_between_dates(self, mock: unittest.mock.Mock):
+        mock.return_value = self.fdb
+        self.fdb.add_food(Food('apple', 100, 0.5, 0.2, 10, 4, 0, 86))
+        self.fdb.add_food(Food('banana', 100, 1, 0.3, 20, 12, 1, 75))
+        entries = [MealEntry(name='apple', date='2022-01-02', portion=200),
+                   MealEntry(name='banana', date='2022-01-01', portion=50),
+                   MealEntry(name='apple', date='2022-01-02', portion=100),
+                   MealEntry(name='banana', date='2022-01-05')]
+        with MealEntryDB() as mdb:
+            for entry in entries:
+                mdb.add_meal_entry(entry)
+            columns = mdb.get_columns_between_dates('2022-01-01', '2022-01-02')
+            expected = sorted(mdb.get_entries_between_dates('2022-01-01', '2022-01-02'), key=lambda e: e.date)
+
+        self.assertEqual([str(d) for d in columns['date']], [e.date for e in expected])
+        for column, attr in (('protein', 'proteins'), ('carbs', 'carbs'), ('sodium', 'sodium'), ('calories', 'cals')):
+            self.assertEqual(list(columns[column]), [getattr(e, attr) for e in expected])
+
+        daily = daily_sums(columns)
+        self.assertEqual([str(d) for d in daily['date']], ['2022-01-01', '2022-01-02'])
+        self.assertEqual(list(daily['portion']), [50, 300])
+
+        with MealEntryDB() as mdb:
+            empty = daily_sums(mdb.get_columns_between_dates('2023-01-01', '2023-01-02'))
+        self.assertEqual(len(empty['date']), 0)
+
+    def test_snapshot_migration(self):
+        self.fdb.add_food(Food('apple', 100, 0.5, 0.2, 10, 4, 0, 86))
+        # An old DB - entries without the nutrient snapshot
+        conn = sqlite3.connect(config.get_db_path())
+        conn.execute('CREATE TABLE meal_entries(meal_id text, portion real, date text, id text)')
+        conn.execute("INSERT INTO meal_entries VALUES ('apple', 200, '2022-01-01', '1')")
+        conn.execute("INSERT INTO food VALUES ('', 100, 1, 1, 1, 0, 0, 0, 'cleared')")  # (a Food whose name was cleared)
+        conn.execute("INSERT INTO meal_entries VALUES ('cleared', 100, '2022-01-02', '2')")
+        conn.execute("INSERT INTO meal_entries VALUES ('deleted', 100, '2022-01-03', '3')")  # (its Food was deleted)
+        conn.commit()
+        conn.close()
+
+        with MealEntryDB() as mdb:
+            entry, = mdb.get_entries_between_dates('2022-01-01', '2022-01-01')
+            self.assertEqual(mdb.get_last_seq(), 3)  # (sequenced - for the incremental exports)
+            cleared, = mdb.get_entries_between_dates('2022-01-02', '2022-01-02')
+            deleted, = mdb.get_entries_between_dates('2022-01-03', '2022-01-03')
+        self.assertEqual((cleared.name, deleted.name), ('cleared', 'deleted'))  # (named by their Food's id)
+        apple = self.fdb.get_food_by_name('apple')
+        self.assertEqual((entry.name, entry.carbs, entry.cals), ('apple', 20, 2 * apple.cals))
+
+        # The history doesn't change when the Food is removed
+        self.fdb.remove(['apple'])
+        with MealEntryDB() as mdb:
+            self.assertEqual(mdb.get_entries_between_dates('2022-01-01', '2022-01-01'), [entry])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+from calorie_count.src.DB import profiles
+from calorie_count.src.DB.meal_entry_db import MealEntryDB
+from calorie_count.src.utils import config
+
+
+class TestProfiles(unittest.TestCase):
+
+    def setUp(self):
+        config.set_db_path_test()
+        with MealEntryDB():  # So the DB will exist as well
+            pass
+        super().setUp()
+
+    def tearDown(self) -> None:
+        profiles.set_profile(profiles.DEFAULT)
+
+    def _pragma(self, name: str):
+        with MealEntryDB() as mdb:
+            return mdb.conn.execute(f'PRAGMA {name}').fetchone()[0]
+
+    def test_default(self):
+        self.assertEqual(self._pragma('journal_mode'), 'delete')
+        self.assertEqual(self._pragma('synchronous'), 2)  # (FULL)
+
+    def test_interactive(self):
+        profiles.set_profile('interactive')
+        self.assertEqual(self._pragma('journal_mode'), 'wal')
+        self.assertEqual(self._pragma('synchronous'), 1)  # (NORMAL)
+        self.assertEqual(self._pragma('cache_size'), -16_000)
+
+    def test_using(self):
+        with profiles.using('bulk-import'):
+            self.assertEqual(self._pragma('synchronous'), 0)  # (OFF)
+        self.assertEqual(profiles.get_profile(), profiles.DEFAULT)
+        with self.assertRaises(ValueError):
+            profiles.set_profile('fast')
+
+    def test_config(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'config.ini')
+            self.assertEqual(config.get_db_profile(path), 'interactive')
+            with open(path, 'w') as fl:
+                fl.write('[DB_PROFILE]\nname = low-memory\n')
+            self.assertEqual(config.get_db_profile(path), 'low-memory')
+
+
+if __name__ == '__main__':
+    unittest.main()
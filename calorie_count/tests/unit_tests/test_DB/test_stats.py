@@ -0,0 +1,49 @@
+import math
+import unittest
+
+from calorie_count.src.DB.food_db import FoodDB, Food
+from calorie_count.src.DB.meal_entry_db import MealEntry, MealEntryDB
+from calorie_count.src.DB.stats import DailyStats
+from calorie_count.src.utils import config
+
+
+class TestDailyStats(unittest.TestCase):
+
+    def setUp(self):
+        config.set_db_path_test()
+        with FoodDB() as fdb:
+            fdb.add_food(Food('apple', 100, 0.5, 0.2, 10, 4, 0, 86))
+        self.mdb = MealEntryDB()
+        for date, portion in (('2022-01-01', 100), ('2022-01-01', 200), ('2022-01-03', 100)):
+            self.mdb.add_meal_entry(MealEntry(name='apple', date=date, portion=portion))
+        self.stats = DailyStats()
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self.stats.close()
+        self.mdb.conn.close()
+
+    def test_total_and_mean(self):
+        total = self.stats.total('2022-01-01', '2022-01-03')
+        self.assertEqual((total['portion'], total['days']), (400, 2))
+        self.assertAlmostEqual(total['carbs'], 40)
+        self.assertAlmostEqual(self.stats.mean('2022-01-01', '2022-01-03')['carbs'], 20)
+        self.assertEqual(self.stats.total('2021-01-01', '2021-12-31')['days'], 0)  # (before the history)
+
+    def test_daily_and_rolling_mean(self):
+        days, daily = self.stats.daily('2021-12-31', '2022-01-05')
+        self.assertEqual(list(days.astype(str)), ['2022-01-01', '2022-01-03'])
+        self.assertEqual(list(daily['portion']), [300, 100])
+        self.assertEqual(list(self.stats.rolling_mean(days, 3)['portion']), [300, 200])
+        self.assertTrue(math.isnan(self.stats.rolling_mean(['2021-12-01'], 7)['portion'][0]))
+
+    def test_updates_on_change(self):
+        self.stats.total('2022-01-01', '2022-01-03')  # (build)
+        self.mdb.add_meal_entry(MealEntry(name='apple', date='2022-01-02', portion=50))
+        self.assertEqual(self.stats.total('2022-01-01', '2022-01-03')['portion'], 450)
+        self.mdb.add_meal_entry(MealEntry(name='apple', date='2022-01-10', portion=50))  # (after the history)
+        self.assertEqual(self.stats.total('2022-01-01', '2022-01-10')['days'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import sqlite3
+import unittest
+
+from calorie_count.src.DB import tracing
+from calorie_count.src.DB.food_db import FoodDB, Food, SQL
+from calorie_count.src.DB.meal_entry_db import MealEntryDB
+from calorie_count.src.utils import config
+
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        config.set_db_path_test()
+        with MealEntryDB():  # So table will exist as well
+            pass
+        self.log = tracing.SlowQueryLog(threshold=0)  # (every statement is "slow")
+        tracing.set_tracer(self.log)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        tracing.set_tracer(None)
+
+    def test_disabled(self):
+        tracing.set_tracer(None)
+        conn = sqlite3.connect(':memory:')
+        self.assertIs(type(tracing.cursor(conn)), sqlite3.Cursor)
+        conn.close()
+
+    def test_slow_query_log(self):
+        with self.assertLogs(tracing.logger, level='WARNING'):
+            with FoodDB() as db:
+                db.add_food(Food('apple', 100, 0.5, 0.2, 10, 4, 0, 86))
+                db.get_food_by_name('apple')
+                db.remove(['apple'])
+        by_name, = [r for r in self.log.entries if r.statement == SQL.food_by_name]
+        self.assertEqual(by_name.parameters, ('apple',))
+        self.assertEqual(by_name.rows, 1)
+        self.assertTrue(by_name.plan)  # e.g. ['SCAN food']
+
+
+if __name__ == '__main__':
+    unittest.main()
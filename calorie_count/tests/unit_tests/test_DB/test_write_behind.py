@@ -0,0 +1,74 @@
+import sqlite3
+import unittest
+from unittest import mock
+
+from calorie_count.src.DB import write_behind
+from calorie_count.src.DB.food_db import FoodDB, Food
+from calorie_count.src.DB.meal_entry_db import MealEntry, MealEntryDB
+from calorie_count.src.utils import config
+
+
+class TestWriteBehind(unittest.TestCase):
+
+    def setUp(self):
+        config.set_db_path_test()
+        with FoodDB() as fdb:
+            fdb.add_food(Food('apple', 100, 0.5, 0.2, 10, 4, 0, 86))
+        self.mdb = MealEntryDB()
+        self.queue = write_behind.enable(interval=60, max_pending=1000)  # (only flushed explicitly)
+        super().setUp()
+
+    def tearDown(self) -> None:
+        write_behind.disable()
+        self.mdb.conn.close()
+
+    def _committed(self) -> int:
+        conn = sqlite3.connect(config.get_db_path())
+        count, = conn.execute('SELECT COUNT(*) FROM meal_entries').fetchone()
+        conn.close()
+        return count
+
+    def test_read_your_writes(self):
+        entries = [self.mdb.add_meal_entry(MealEntry(name='apple', date='2022-01-01', portion=p)) for p in (100, 200)]
+        self.assertEqual(self._committed(), 0)
+        self.assertEqual(self.mdb.get_entries_between_dates('2022-01-01', '2022-01-01'), entries)
+
+        self.assertTrue(write_behind.flush(timeout=5))
+        self.assertEqual(self._committed(), 2)
+        self.assertEqual(self.mdb.get_entries_between_dates('2022-01-01', '2022-01-01'), entries)
+
+    def test_delete(self):
+        committed = self.mdb.add_meal_entry(MealEntry(name='apple', date='2022-01-01'))
+        self.assertTrue(write_behind.flush(timeout=5))
+        queued = self.mdb.add_meal_entry(MealEntry(name='apple', date='2022-01-01'))
+
+        self.mdb.delete_entry(queued.id)  # (dropped from the queue)
+        self.mdb.delete_entry(committed.id)  # (queued)
+        self.assertEqual(self.mdb.get_entries_between_dates('2022-01-01', '2022-01-01'), [])
+        self.assertEqual(self._committed(), 1)
+        self.assertTrue(write_behind.flush(timeout=5))
+        self.assertEqual(self._committed(), 0)
+
+    def test_flush_after_dropped_insert(self):
+        queued = self.mdb.add_meal_entry(MealEntry(name='apple', date='2022-01-01'))
+        self.mdb.delete_entry(queued.id)  # (dropped from the queue - nothing left to write)
+        self.assertTrue(write_behind.flush(timeout=5))
+        self.assertEqual(self._committed(), 0)
+
+    def test_failed_batch_is_kept(self):
+        entry = self.mdb.add_meal_entry(MealEntry(name='apple', date='2022-01-01'))
+        with mock.patch.object(MealEntryDB, '_insert', side_effect=sqlite3.DatabaseError('disk I/O error')):
+            with self.assertRaises(sqlite3.DatabaseError):
+                write_behind.flush(timeout=5)
+        self.assertEqual(self.mdb.get_entries_between_dates('2022-01-01', '2022-01-01'), [entry])  # (still queued)
+        self.assertTrue(write_behind.flush(timeout=5))
+        self.assertEqual(self._committed(), 1)
+
+    def test_disable_flushes(self):
+        self.mdb.add_meal_entry(MealEntry(name='apple', date='2022-01-01'))
+        write_behind.disable()
+        self.assertEqual(self._committed(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
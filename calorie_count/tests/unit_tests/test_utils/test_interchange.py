@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from dataclasses import replace
+
+from calorie_count.src.DB.food_db import FoodDB, Food
+from calorie_count.src.DB.meal_entry_db import MealEntry, MealEntryDB
+from calorie_count.src.utils import config, interchange
+
+
+class TestInterchange(unittest.TestCase):
+
+    def setUp(self):
+        config.set_db_path_test()
+        with FoodDB() as fdb:
+            fdb.add_food(Food("Ben & Jerry's, \"Chunky\"", 100, 4, 15, 28, 24, 0.1, 50))
+            fdb.add_food(Food('apple', 100, 0.5, 0.2, 10, 4, 0, 86))
+        with MealEntryDB() as mdb:
+            for date in ('2022-01-01', '2022-01-02'):
+                mdb.add_meal_entry(MealEntry(name='apple', date=date, portion=200))
+        self.tmp = tempfile.TemporaryDirectory()
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def _round_trip(self, fmt: str, compress: bool):
+        with FoodDB() as fdb:
+            foods = fdb.get_all_foods()
+        with MealEntryDB() as mdb:
+            entries = mdb.get_entries_between_dates('2022-01-01', '2022-01-02')
+
+        foods_path, entries_path = interchange.export(self.tmp.name, fmt, compress)
+        self.assertTrue(foods_path.endswith(f'.foods.{fmt}{".gz" if compress else ""}'))
+
+        with FoodDB() as fdb:
+            fdb.remove([f.name for f in foods])
+        self.assertEqual(interchange.import_file(foods_path), (interchange.FOODS, 2))
+        self.assertEqual(interchange.import_file(entries_path), (interchange.MEAL_ENTRIES, 2))
+
+        with FoodDB() as fdb:
+            self.assertEqual(sorted(f.values for f in fdb.get_all_foods()), sorted(f.values for f in foods))
+        with MealEntryDB() as mdb:  # (the entries are added - each one twice now)
+            imported = mdb.get_entries_between_dates('2022-01-01', '2022-01-02')
+        self.assertEqual(sorted(e.values for e in imported), sorted(e.values for e in entries * 2))
+        self.assertEqual(len({e.id for e in imported}), 4)
+
+    def test_csv(self):
+        self._round_trip('csv', compress=False)
+
+    def test_jsonl_gz(self):
+        self._round_trip('jsonl', compress=True)
+
+    def test_incremental(self):
+        def exported_entries(path):
+            with interchange._open(path, 'r') as fl:
+                return [row[0] for row in interchange.read_rows(fl, 'csv')[1]]
+
+        _, first = interchange.export(self.tmp.name, incremental=True)
+        self.assertEqual(exported_entries(first), ['2022-01-01', '2022-01-02'])  # (everything - never exported)
+
+        with MealEntryDB() as mdb:
+            mdb.add_meal_entry(MealEntry(name='apple', date='2021-12-31'))
+        _, second = interchange.export(self.tmp.name, incremental=True)
+        self.assertNotEqual(first, second)
+        self.assertEqual(exported_entries(second), ['2021-12-31'])  # (only the new one)
+
+        _, third = interchange.export(self.tmp.name, incremental=True)
+        self.assertEqual(exported_entries(third), [])
+
+        # The clock was set back - the new entry's id is older than the exported ones, it's still exported
+        with MealEntryDB() as mdb:
+            mdb._insert(replace(MealEntry(name='apple', date='2021-12-30'), id='2000-01-01T00:00:00'))
+            mdb.conn.commit()
+        _, fourth = interchange.export(self.tmp.name, incremental=True)
+        self.assertEqual(exported_entries(fourth), ['2021-12-30'])
+        # (another target - its own mark)
+        _, other = interchange.export(self.tmp.name, fmt='jsonl', incremental=True)
+        self.assertTrue(other.endswith('.jsonl.gz'))
+        self.assertIsNotNone(interchange.get_mark(interchange._target(self.tmp.name, interchange.DEFAULT_NAME, 'jsonl')))
+
+    def test_invalid(self):
+        path = os.path.join(self.tmp.name, 'other.csv')
+        with open(path, 'w') as fl:
+            fl.write('a,b\n1,2\n')
+        with self.assertRaises(ValueError):
+            interchange.import_file(path)
+        with self.assertRaises(ValueError):
+            interchange.import_file(os.path.join(self.tmp.name, 'other.txt'))
+
+
+if __name__ == '__main__':
+    unittest.main()
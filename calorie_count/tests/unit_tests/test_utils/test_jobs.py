@@ -0,0 +1,81 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from calorie_count.src.DB.food_db import FoodDB, Food
+from calorie_count.src.DB.meal_entry_db import MealEntry, MealEntryDB
+from calorie_count.src.utils import config, interchange, jobs
+
+
+class TestJobs(unittest.TestCase):
+
+    def setUp(self):
+        config.set_db_path_test()
+        with FoodDB() as fdb:
+            fdb.add_food(Food('apple', 100, 0.5, 0.2, 10, 4, 0, 86))
+        with MealEntryDB() as mdb:
+            mdb.add_meal_entries(MealEntry(name='apple', date='2022-01-01') for _ in range(1200))
+        self.tmp = tempfile.TemporaryDirectory()
+        super().setUp()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_progress(self):
+        job = jobs.Job(interchange.export, self.tmp.name).start()
+        self.assertTrue(job.join(timeout=10))
+        self.assertTrue(job.completed)
+        self.assertEqual((job.done, job.total), (1201, 1201))  # (the Food and the entries)
+        self.assertEqual(len(job.result), 2)
+
+    def test_cancel(self):
+        started, resume = threading.Event(), threading.Event()
+
+        def _wait(progress):
+            progress(0, 2)
+            started.set()
+            resume.wait(timeout=10)
+            progress(1, 2)
+
+        job = jobs.Job(_wait).start()
+        started.wait(timeout=10)
+        job.cancel()
+        resume.set()
+        self.assertTrue(job.join(timeout=10))
+        self.assertTrue(job.cancelled)
+        self.assertFalse(job.completed)
+        self.assertIsNone(job.error)
+        self.assertEqual(job.done, 1)
+
+    def test_cancelled_import_is_rolled_back(self):
+        _, entries_path = interchange.export(self.tmp.name, compress=False)
+
+        def _progress(done, total):
+            if done >= jobs.PROGRESS_EVERY:  # (some of the entries were added)
+                raise jobs.Cancelled()
+
+        with self.assertRaises(jobs.Cancelled):
+            interchange.import_file(entries_path, progress=_progress)
+        with MealEntryDB() as mdb:
+            self.assertEqual(mdb.count(), 1200)
+
+    def test_cancelled_export_is_removed(self):
+        def _progress(done, total):
+            if done >= jobs.PROGRESS_EVERY:
+                raise jobs.Cancelled()
+
+        path = os.path.join(self.tmp.name, 'entries.csv')
+        with self.assertRaises(jobs.Cancelled):
+            interchange.export_table(path, interchange.MEAL_ENTRIES, progress=_progress)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_error(self):
+        job = jobs.Job(interchange.import_file, os.path.join(self.tmp.name, 'missing.csv')).start()
+        self.assertTrue(job.join(timeout=10))
+        self.assertIsInstance(job.error, FileNotFoundError)
+        self.assertFalse(job.completed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from calorie_count.src.utils.profiling import FrameProfiler, profiler, timed
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        profiler.reset()
+        profiler.enabled = True  # (without the kivy frame counter)
+
+    def tearDown(self):
+        profiler.enabled = False
+        profiler.reset()
+
+    def test_timed(self):
+        @timed(name='handler')
+        def handler(x):
+            return x * 2
+
+        self.assertEqual(handler(2), 4)
+        self.assertEqual(profiler.stats['handler'].calls, 1)
+
+    def test_disabled(self):
+        profiler.enabled = False
+
+        @timed
+        def handler():
+            pass
+
+        handler()
+        self.assertFalse(profiler.stats)
+
+    def test_over_budget(self):
+        @timed(name='slow')
+        def slow():
+            time.sleep(profiler.budget * 1.5)
+
+        with self.assertLogs('kivy', level='WARNING'):
+            slow()
+        self.assertEqual(profiler.stats['slow'].over_budget, 1)
+
+    def test_dropped_frames(self):
+        p = FrameProfiler(budget=0.01)
+        p._on_frame(0.01)
+        p._on_frame(0.03)
+        self.assertEqual((p.frames, p.dropped_frames), (2, 2))
+
+    def test_export_trace(self):
+        profiler.record('handler', time.perf_counter(), 0.001)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = profiler.export_trace(os.path.join(tmp, 'trace.json'))
+            with open(path) as fl:
+                events = json.load(fl)['traceEvents']
+        self.assertEqual([(e['name'], e['dur']) for e in events], [('handler', 1000)])
+
+
+if __name__ == '__main__':
+    unittest.main()